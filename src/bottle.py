@@ -69,9 +69,10 @@ if __name__ == '__main__':
 # Imports and Python 2/3 unification ##########################################
 ###############################################################################
 
-import base64, calendar, email.utils, functools, hmac, itertools,\
-       mimetypes, os, re, tempfile, threading, time, warnings, weakref, hashlib
+import base64, calendar, email.utils, functools, gzip, hmac, itertools,\
+       marshal, mimetypes, os, re, tempfile, threading, time, warnings, weakref, hashlib
 
+from collections import OrderedDict
 from types import FunctionType
 from datetime import date as datedate, datetime, timedelta
 from tempfile import NamedTemporaryFile
@@ -83,6 +84,12 @@ try:
 except ImportError:
     from json import dumps as json_dumps, loads as json_lds
 
+try:
+    from orjson import dumps as orjson_dumps, OPT_INDENT_2 as orjson_indent, \
+                       OPT_PASSTHROUGH_DATETIME, OPT_PASSTHROUGH_DATACLASS
+except ImportError:
+    orjson_dumps = None
+
 py = sys.version_info
 py3k = py.major > 2
 
@@ -159,6 +166,11 @@ def touni(s, enc='utf8', err='strict'):
 
 tonat = touni if py3k else tob
 
+try:
+    _isascii = unicode.isascii
+except AttributeError:  # Python < 3.7
+    _isascii = lambda s: False
+
 
 def _stderr(*args):
     try:
@@ -296,6 +308,20 @@ def _re_flatten(p):
                   len(m.group(1)) % 2 else m.group(1) + '(?:', p)
 
 
+class _TrieNode(object):
+    """ One path segment in the search trie of a :class:`Router` in
+        ``trie`` mode. """
+
+    __slots__ = ('static', 'dynamic', 'patterns', 'tails', 'leaf')
+
+    def __init__(self):
+        self.static = {}  # Literal segment -> child node
+        self.dynamic = []  # (segment fullmatch, child node) pairs
+        self.patterns = {}  # Segment pattern -> child node (for inserts)
+        self.tails = []  # (remainder match, rule index) pairs
+        self.leaf = None  # Index of the first rule ending here
+
+
 class Router(object):
     """ A Router is an ordered collection of route->target pairs. It is used to
         efficiently match WSGI requests against a number of routes and return
@@ -306,6 +332,13 @@ class Router(object):
         The path-rule is either a static path (e.g. `/contact`) or a dynamic
         path that contains wildcards (e.g. `/wiki/<page>`). The wildcard syntax
         and details on the matching order are described in docs:`routing`.
+
+        In the default ``regex`` mode, dynamic routes are matched by a few
+        large combined regular expressions. The ``trie`` mode stores them in
+        a tree of path segments instead, so lookup cost depends on the depth
+        of the path and not on the number of routes. Both modes return the
+        same route for the same request. To use it, replace the router of a
+        fresh application: ``app.router = Router(mode='trie')``.
     """
 
     default_pattern = '[^/]+'
@@ -315,15 +348,34 @@ class Router(object):
     #: than 99 matching groups per regular expression.
     _MAX_GROUPS_PER_PATTERN = 99
 
-    def __init__(self, strict=False):
+    #: Wildcard patterns that never match a slash. Segments made only of
+    #: these and literal text become trie nodes; anything else (e.g. ``path``
+    #: or custom regular expressions) is matched against the rest of the path.
+    _SEGMENT_SAFE = frozenset([default_pattern, r'-?\d+', r'-?[\d.]+'])
+
+    modes = ('regex', 'trie')
+
+    def __init__(self, strict=False, mode='regex'):
+        if mode not in self.modes:
+            raise RouterUnknownModeError("Unknown router mode: %r" % mode)
         self.rules = []  # All rules in order
         self._groups = {}  # index of regexes to find them in dyna_routes
         self.builder = {}  # Data structure for the url builder
         self.static = {}  # Search structure for static routes
         self.dyna_routes = {}
         self.dyna_regexes = {}  # Search structure for dynamic routes
+        self.dyna_tries = {}  # Search structure for dynamic routes (trie mode)
+        # Search structures for the Allow header of 405 responses. Every
+        # distinct dynamic pattern gets an id and the set of its methods.
+        self._static_methods = {}  # Static path -> set of methods
+        self._any_ids = {}  # Flat pattern -> pattern id
+        self._any_methods = []  # Pattern id -> set of methods
+        self._any_trie = _TrieNode()  # All patterns by id (trie mode)
+        self._any_regexes = None  # Lazily compiled, see _allowed_methods()
         #: If true, static routes are no longer checked first.
         self.strict_order = strict
+        #: Either ``regex`` or ``trie``. See class documentation.
+        self.mode = mode
         self.filters = {
             're': lambda conf: (_re_flatten(conf or self.default_pattern),
                                 None, None),
@@ -371,6 +423,7 @@ class Router(object):
         pattern = ''  # Regular expression pattern with named groups
         filters = []  # Lists of wildcard input filters
         builder = []  # Data structure for the URL builder
+        parts = []  # (literal, mask) pairs for the trie
         is_static = True
 
         for key, mode, conf in self._itertokens(rule):
@@ -387,16 +440,20 @@ class Router(object):
                     keys.append(key)
                 if in_filter: filters.append((key, in_filter))
                 builder.append((key, out_filter or str))
+                parts.append((None, mask))
             elif key:
                 pattern += re.escape(key)
                 builder.append((None, key))
+                parts.append((key, None))
 
         self.builder[rule] = builder
         if name: self.builder[name] = builder
 
         if is_static and not self.strict_order:
             self.static.setdefault(method, {})
-            self.static[method][self.build(rule)] = (target, None)
+            path = self.build(rule)
+            self.static[method][path] = (target, None)
+            self._static_methods.setdefault(path, set()).add(method)
             return
 
         try:
@@ -434,8 +491,20 @@ class Router(object):
         else:
             self.dyna_routes.setdefault(method, []).append(whole_rule)
             self._groups[flatpat, method] = len(self.dyna_routes[method]) - 1
+            if self.mode == 'trie':
+                self._insert(self.dyna_tries.setdefault(method, _TrieNode()),
+                             parts, self._groups[flatpat, method])
+
+        if flatpat not in self._any_ids:
+            self._any_ids[flatpat] = len(self._any_methods)
+            self._any_methods.append(set())
+            if self.mode == 'trie':
+                self._insert(self._any_trie, parts, self._any_ids[flatpat])
+            self._any_regexes = None
+        self._any_methods[self._any_ids[flatpat]].add(method)
 
-        self._compile(method)
+        if self.mode == 'regex':
+            self._compile(method)
 
     def _compile(self, method):
         all_rules = self.dyna_routes[method]
@@ -449,6 +518,139 @@ class Router(object):
             rules = [(target, getargs) for (_, _, target, getargs) in some]
             comborules.append((combined, rules))
 
+    def _compile_any(self):
+        """ Split all distinct patterns into blocks for :meth:`_allowed_methods`.
+            Each block caches one alternation per start index, so a path that
+            fits several patterns is resolved with one match per hit. """
+        flatpats = sorted(self._any_ids, key=self._any_ids.get)
+        maxgroups = self._MAX_GROUPS_PER_PATTERN
+        self._any_regexes = [(x, flatpats[x:x + maxgroups], {})
+                             for x in range(0, len(flatpats), maxgroups)]
+
+    def _allowed_methods(self, path):
+        """ Return the set of all methods with a route matching path. """
+        allowed = set(self._static_methods.get(path, ()))
+        if not self._any_methods:
+            return allowed
+        if self.mode == 'trie':
+            ids = set()
+            self._trie_collect(self._any_trie, path.split('/'), 0, ids)
+        else:
+            if self._any_regexes is None:
+                self._compile_any()
+            ids = []
+            for offset, some, cache in self._any_regexes:
+                start = 0
+                while start < len(some):
+                    combined = cache.get(start)
+                    if combined is None:
+                        combined = '|'.join('(^%s$)' % flatpat for flatpat in some[start:])
+                        combined = cache[start] = re.compile(combined).match
+                    match = combined(path)
+                    if not match:
+                        break
+                    start += match.lastindex
+                    ids.append(offset + start - 1)
+        for pattern_id in ids:
+            allowed.update(self._any_methods[pattern_id])
+        return allowed
+
+    def _insert(self, node, parts, index):
+        """ Add a rule (as collected by :meth:`add`) below a trie node. """
+        segments = [[]]
+        for literal, mask in parts:
+            if literal is None:
+                segments[-1].append((None, mask))
+                continue
+            chunks = literal.split('/')
+            if chunks[0]: segments[-1].append((chunks[0], None))
+            for chunk in chunks[1:]:
+                segments.append([(chunk, None)] if chunk else [])
+
+        def seg_pattern(segment):
+            return ''.join(re.escape(lit) if mask is None else
+                           '(?:%s)' % _re_flatten(mask) for lit, mask in segment)
+
+        for i, segment in enumerate(segments):
+            masks = [mask for lit, mask in segment if mask is not None]
+            if not masks:
+                literal = ''.join(lit for lit, _ in segment)
+                node = node.static.setdefault(literal, _TrieNode())
+            elif all(mask in self._SEGMENT_SAFE for mask in masks):
+                segpat = seg_pattern(segment)
+                if segpat not in node.patterns:
+                    child = node.patterns[segpat] = _TrieNode()
+                    node.dynamic.append((re.compile(segpat + r'\Z').match, child))
+                node = node.patterns[segpat]
+            else:
+                rest = '/'.join(seg_pattern(seg) for seg in segments[i:])
+                try:
+                    node.tails.append((re.compile('^(%s)$' % rest).match, index))
+                except re.error as e:
+                    raise RouteSyntaxError("Could not add Route: %s" % e)
+                return
+        if node.leaf is None or index < node.leaf:
+            node.leaf = index
+
+    def _trie_search(self, node, segments, i):
+        """ Return the lowest rule index matching segments[i:] below node. """
+        best = None
+        if node.tails:
+            rest = '/'.join(segments[i:])
+            for match, index in node.tails:
+                if (best is None or index < best) and match(rest):
+                    best = index
+        if i == len(segments):
+            if node.leaf is not None and (best is None or node.leaf < best):
+                best = node.leaf
+            return best
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._trie_search(child, segments, i + 1)
+            if found is not None and (best is None or found < best):
+                best = found
+        for match, child in node.dynamic:
+            if match(segment):
+                found = self._trie_search(child, segments, i + 1)
+                if found is not None and (best is None or found < best):
+                    best = found
+        return best
+
+    def _trie_collect(self, node, segments, i, found):
+        """ Add every rule index matching segments[i:] below node to found. """
+        if node.tails:
+            rest = '/'.join(segments[i:])
+            found.update(index for match, index in node.tails if match(rest))
+        if i == len(segments):
+            if node.leaf is not None:
+                found.add(node.leaf)
+            return
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            self._trie_collect(child, segments, i + 1, found)
+        for match, child in node.dynamic:
+            if match(segment):
+                self._trie_collect(child, segments, i + 1, found)
+
+    def _match_dynamic(self, method, path):
+        """ Return the (target, getargs) pair of the first dynamic route of a
+            method that matches path, or None. """
+        if self.mode == 'trie':
+            if method in self.dyna_tries:
+                index = self._trie_search(self.dyna_tries[method],
+                                          path.split('/'), 0)
+                if index is not None:
+                    _, _, target, getargs = self.dyna_routes[method][index]
+                    return target, getargs
+        elif method in self.dyna_regexes:
+            for combined, rules in self.dyna_regexes[method]:
+                match = combined(path)
+                if match:
+                    return rules[match.lastindex - 1]
+        return None
+
     def build(self, _name, *anons, **query):
         """ Build an URL by filling the wildcards in a rule. """
         builder = self.builder.get(_name)
@@ -473,24 +675,13 @@ class Router(object):
             if method in self.static and path in self.static[method]:
                 target, getargs = self.static[method][path]
                 return target, getargs(path) if getargs else {}
-            elif method in self.dyna_regexes:
-                for combined, rules in self.dyna_regexes[method]:
-                    match = combined(path)
-                    if match:
-                        target, getargs = rules[match.lastindex - 1]
-                        return target, getargs(path) if getargs else {}
+            found = self._match_dynamic(method, path)
+            if found:
+                target, getargs = found
+                return target, getargs(path) if getargs else {}
 
         # No matching route found. Collect alternative methods for 405 response
-        allowed = set([])
-        nocheck = set(methods)
-        for method in set(self.static) - nocheck:
-            if path in self.static[method]:
-                allowed.add(method)
-        for method in set(self.dyna_regexes) - allowed - nocheck:
-            for combined, rules in self.dyna_regexes[method]:
-                match = combined(path)
-                if match:
-                    allowed.add(method)
+        allowed = self._allowed_methods(path) - set(methods)
         if allowed:
             allow_header = ",".join(sorted(allowed))
             raise HTTPError(405, "Method not allowed.", Allow=allow_header)
@@ -1062,8 +1253,12 @@ class Bottle(object):
 
         # File-like objects.
         if hasattr(out, 'read'):
-            if 'wsgi.file_wrapper' in request.environ:
-                return request.environ['wsgi.file_wrapper'](out)
+            wrapper = request.environ.get('wsgi.file_wrapper')
+            if isinstance(out, WSGIFileWrapper) and (wrapper is None or (
+                    isinstance(wrapper, type) and issubclass(wrapper, WSGIFileWrapper))):
+                return out  # Keep offset and length visible to the server.
+            if wrapper is not None:
+                return wrapper(out)
             elif hasattr(out, 'close') or not hasattr(out, '__iter__'):
                 return WSGIFileWrapper(out)
 
@@ -1238,10 +1433,8 @@ class BaseRequest(object):
             values are sometimes called "URL arguments" or "GET parameters", but
             not to be confused with "URL wildcards" as they are provided by the
             :class:`Router`. """
-        get = self.environ['bottle.get'] = FormsDict()
-        pairs = _parse_qsl(self.environ.get('QUERY_STRING', ''))
-        for key, value in pairs:
-            get[key] = value
+        get = self.environ['bottle.get'] = _QueryFormsDict(
+            self.environ.get('QUERY_STRING', ''))
         return get
 
     @DictProperty('environ', 'bottle.request.forms', read_only=True)
@@ -1312,29 +1505,58 @@ class BaseRequest(object):
     def _iter_chunked(read, bufsize):
         err = HTTPError(400, 'Error while parsing chunked transfer body.')
         rn, sem, bs = tob('\r\n'), tob(';'), tob('')
+
+        # Reads are sized so they never go past the end of the body, which may
+        # be followed by a pipelined request: chunk data is always followed by
+        # at least 7 bytes ("\r\n0\r\n\r\n"), an unfinished chunk-size line
+        # by at least 3 ("\n\r\n") and an unfinished trailer line by 1.
+        def readline(buff, ahead, eof_ok=False):
+            end = buff.find(rn)
+            while end < 0:
+                if len(buff) > bufsize: raise err
+                c = read(ahead)
+                if not c:
+                    if eof_ok and not buff: return bs, buff
+                    raise err
+                buff += c
+                end = buff.find(rn, max(0, len(buff) - len(c) - 1))
+            if end + 2 > bufsize: raise err
+            return buff[:end], buff[end + 2:]
+
+        buff = bs
         while True:
-            header = read(1)
-            while header[-2:] != rn:
-                c = read(1)
-                header += c
-                if not c: raise err
-                if len(header) > bufsize: raise err
+            header, buff = readline(buff, 3)
             size, _, _ = header.partition(sem)
             try:
                 maxread = int(tonat(size.strip()), 16)
             except ValueError:
                 raise err
             if maxread == 0: break
-            buff = bs
             while maxread > 0:
                 if not buff:
-                    buff = read(min(maxread, bufsize))
+                    # Small chunks pull in the next chunk-size line with the
+                    # data; big ones are read exactly so they are not copied.
+                    buff = read(min(maxread + 7 if maxread < 4096 else maxread, bufsize))
+                    if not buff: raise err
                 part, buff = buff[:maxread], buff[maxread:]
-                if not part: raise err
                 yield part
                 maxread -= len(part)
-            if read(2) != rn:
+            while len(buff) < 2:
+                c = read(2 - len(buff))
+                if not c: raise err
+                buff += c
+            if buff[:2] != rn:
                 raise err
+            buff = buff[2:]
+
+        # Skip the (optional) trailer section up to the final empty line. A
+        # body that simply ends after the last-chunk line is accepted too.
+        trailer = 0
+        while True:
+            line, buff = readline(buff, 1, eof_ok=not trailer)
+            if not line: break
+            trailer += len(line)
+            if trailer > bufsize: raise err
 
     @DictProperty('environ', 'bottle.request.body', read_only=True)
     def _body(self):
@@ -1377,6 +1599,25 @@ class BaseRequest(object):
         self._body.seek(0)
         return self._body
 
+    def iter_body(self, bufsize=2 ** 16):
+        """ Iterate over the request body in chunks of at most `bufsize`
+            bytes, read straight from ``wsgi.input`` without buffering it in
+            memory or a temporary file first. Intended for large uploads that
+            are written somewhere else anyway. The body can only be consumed
+            once: afterwards :attr:`body` is empty. If :attr:`body` was
+            already accessed, its content is returned instead. """
+        if 'bottle.request.body' in self.environ:
+            body = self.body
+            return iter(lambda: body.read(bufsize), b'')
+        try:
+            read_func = self.environ['wsgi.input'].read
+        except KeyError:
+            return iter(())
+        self.environ['bottle.request.body'] = BytesIO()
+        if self.chunked:
+            return self._iter_chunked(read_func, bufsize)
+        return self._iter_body(read_func, bufsize)
+
     @property
     def chunked(self):
         """ True if Chunked transfer encoding was. """
@@ -1740,7 +1981,7 @@ class BaseResponse(object):
     def headers(self):
         """ An instance of :class:`HeaderDict`, a case-insensitive dict-like
             view on the response headers. """
-        hdict = HeaderDict()
+        hdict = HeaderDict.__new__(HeaderDict)
         hdict.dict = self._headers
         return hdict
 
@@ -1997,6 +2238,43 @@ class PluginError(BottleException):
     pass
 
 
+def _json_reject(obj):
+    raise TypeError('Not handled by orjson: %r' % type(obj))
+
+
+def _json_encoder(ascii=False, indent=False, fast=False):
+    """ Return a function that turns a value into JSON as UTF-8 bytes,
+        compact unless `indent` is true.
+
+        With `fast` (and without `ascii`) orjson is used if it is installed.
+        Dates and dataclasses are then left to the normal encoder, so they
+        fail the same way, but orjson still writes NaN and Infinity as
+        ``null`` and encodes UUIDs and enums itself. """
+    if json_dumps.__module__ == 'json':
+        from json import JSONEncoder
+        # A prepared encoder skips the argument handling of json.dumps().
+        # ASCII output is always allowed and is the faster path: encoding
+        # the result to bytes is then a plain copy.
+        text = JSONEncoder(indent=2 if indent else None,
+                           separators=(',', ': ') if indent else (',', ':')).encode
+    else:
+        text = functools.partial(json_dumps, ensure_ascii=ascii, indent=2 if indent else 0)
+    encode = lambda obj: text(obj).encode('utf8')
+    if orjson_dumps is None or ascii or not fast:
+        return encode
+    option = OPT_PASSTHROUGH_DATETIME | OPT_PASSTHROUGH_DATACLASS
+    if indent:
+        option |= orjson_indent
+
+    def fast_encode(obj):
+        try:
+            return orjson_dumps(obj, default=_json_reject, option=option)
+        except TypeError:  # Non-str keys, huge ints, dates, ...
+            return encode(obj)
+
+    return fast_encode
+
+
 class JSONPlugin(object):
     name = 'json'
     api = 2
@@ -2009,16 +2287,32 @@ class JSONPlugin(object):
                           help="Enable or disable automatic dict->json filter.")
         app.config._define('json.ascii', default=False, validate=bool,
                           help="Use only 7-bit ASCII characters in output.")
-        app.config._define('json.indent', default=True, validate=bool,
+        app.config._define('json.indent', default=False, validate=bool,
                           help="Add whitespace to make json more readable.")
+        app.config._define('json.fast', default=False, validate=bool,
+                          help="Use orjson if installed. NaN and Infinity are"
+                               " then encoded as null.")
         app.config._define('json.dump_func', default=None,
                           help="If defined, use this function to transform"
                                " dict into json. The other options no longer"
                                " apply.")
+        app.add_hook('config', functools.partial(self._config_changed, app))
+
+    def _config_changed(self, app, config, key, value):
+        if key.startswith('json.'):
+            app.reset()  # Encoders are chosen per route in apply().
 
     def apply(self, callback, route):
-        dumps = self.json_dumps
-        if not self.json_dumps: return callback
+        config = route.config
+        if not self.json_dumps or not config.get('json.enable', True):
+            return callback
+        dumps = config.get('json.dump_func') or self.json_dumps
+        if dumps is json_dumps:
+            # Default settings: use an encoder prepared once for this route
+            # that produces bytes, so _cast() has nothing left to encode.
+            dumps = _json_encoder(config.get('json.ascii', False),
+                                  config.get('json.indent', False),
+                                  config.get('json.fast', False))
 
         @functools.wraps(callback)
         def wrapper(*a, **ka):
@@ -2109,6 +2403,12 @@ class _ImportRedirect(object):
 ###############################################################################
 
 
+class _MultiValue(list):
+    """ Value list of a :class:`MultiDict` key that was set more than once.
+        Keys with a single value store it as is. """
+    __slots__ = ()
+
+
 class MultiDict(DictMixin):
     """ This dict stores multiple values per key, but behaves exactly like a
         normal dict in that it returns only the newest value for any given key.
@@ -2116,39 +2416,70 @@ class MultiDict(DictMixin):
     """
 
     def __init__(self, *a, **k):
-        self.dict = dict((k, [v]) for (k, v) in dict(*a, **k).items())
+        self._data = dict(*a, **k)
+
+    # Keys with a single value store it as is, repeated ones a _MultiValue.
+    # Once :attr:`dict` is used, every value is a plain list instead.
+    _lists = False
+
+    def _last(self, val):
+        return val[-1] if self._lists or val.__class__ is _MultiValue else val
+
+    def _list(self, val):
+        return val if self._lists or val.__class__ is _MultiValue else (val,)
+
+    def _get_dict(self):
+        if not self._lists:
+            data = self._data
+            for key, val in data.items():
+                data[key] = list(self._list(val))
+            self._lists = True
+        return self._data
+
+    def _set_dict(self, value):
+        self._data = value
+        self._lists = True
+
+    dict = property(_get_dict, _set_dict, None, '''
+        All values as a dict of lists. This is the live storage: changes to
+        it show up in this dict and the other way round. ''')
+    del _get_dict, _set_dict
 
     def __len__(self):
-        return len(self.dict)
+        return len(self._data)
 
     def __iter__(self):
-        return iter(self.dict)
+        return iter(self._data)
 
     def __contains__(self, key):
-        return key in self.dict
+        return key in self._data
 
     def __delitem__(self, key):
-        del self.dict[key]
+        del self._data[key]
 
     def __getitem__(self, key):
-        return self.dict[key][-1]
+        val = self._data[key]
+        return val[-1] if self._lists or val.__class__ is _MultiValue else val
 
     def __setitem__(self, key, value):
         self.append(key, value)
 
     def keys(self):
-        return self.dict.keys()
+        return self._data.keys()
 
     if py3k:
 
         def values(self):
-            return (v[-1] for v in self.dict.values())
+            last = self._last
+            return (last(v) for v in self._data.values())
 
         def items(self):
-            return ((k, v[-1]) for k, v in self.dict.items())
+            last = self._last
+            return ((k, last(v)) for k, v in self._data.items())
 
         def allitems(self):
-            return ((k, v) for k, vl in self.dict.items() for v in vl)
+            each = self._list
+            return ((k, v) for k, vl in self._data.items() for v in each(vl))
 
         iterkeys = keys
         itervalues = values
@@ -2158,25 +2489,29 @@ class MultiDict(DictMixin):
     else:
 
         def values(self):
-            return [v[-1] for v in self.dict.values()]
+            return [self._last(v) for v in self._data.values()]
 
         def items(self):
-            return [(k, v[-1]) for k, v in self.dict.items()]
+            return [(k, self._last(v)) for k, v in self._data.items()]
 
         def iterkeys(self):
-            return self.dict.iterkeys()
+            return self._data.iterkeys()
 
         def itervalues(self):
-            return (v[-1] for v in self.dict.itervalues())
+            last = self._last
+            return (last(v) for v in self._data.itervalues())
 
         def iteritems(self):
-            return ((k, v[-1]) for k, v in self.dict.iteritems())
+            last = self._last
+            return ((k, last(v)) for k, v in self._data.iteritems())
 
         def iterallitems(self):
-            return ((k, v) for k, vl in self.dict.iteritems() for v in vl)
+            each = self._list
+            return ((k, v) for k, vl in self._data.iteritems() for v in each(vl))
 
         def allitems(self):
-            return [(k, v) for k, vl in self.dict.iteritems() for v in vl]
+            each = self._list
+            return [(k, v) for k, vl in self._data.iteritems() for v in each(vl)]
 
     def get(self, key, default=None, index=-1, type=None):
         """ Return the most recent value for a key.
@@ -2189,7 +2524,8 @@ class MultiDict(DictMixin):
                     the default value to be returned.
         """
         try:
-            val = self.dict[key][index]
+            val = self._data[key]
+            val = self._last(val) if index == -1 else self._list(val)[index]
             return type(val) if type else val
         except Exception:
             pass
@@ -2197,15 +2533,27 @@ class MultiDict(DictMixin):
 
     def append(self, key, value):
         """ Add a new value to the list of values for this key. """
-        self.dict.setdefault(key, []).append(value)
+        data = self._data
+        if self._lists:
+            data.setdefault(key, []).append(value)
+        elif key not in data:
+            data[key] = value
+        else:
+            val = data[key]
+            if val.__class__ is _MultiValue:
+                val.append(value)
+            else:
+                data[key] = _MultiValue((val, value))
 
     def replace(self, key, value):
         """ Replace the list of values with a single value. """
-        self.dict[key] = [value]
+        self._data[key] = [value] if self._lists else value
 
     def getall(self, key):
         """ Return a (possibly empty) list of values for a key. """
-        return self.dict.get(key) or []
+        if key not in self._data:
+            return []
+        return list(self._list(self._data[key]))
 
     #: Aliases for WTForms to mimic other multi-dict APIs (Django)
     getone = get
@@ -2228,7 +2576,18 @@ class FormsDict(MultiDict):
 
     def _fix(self, s, encoding=None):
         if isinstance(s, unicode) and self.recode_unicode:  # Python 3 WSGI
-            return s.encode('latin1').decode(encoding or self.input_encoding)
+            encoding = encoding or self.input_encoding
+            if encoding in _ascii_compatible and _isascii(s):
+                return s
+            # Each value is recoded only once, not on every attribute access.
+            cache = self.__dict__.get('_recoded')
+            if cache is None:
+                cache = self.__dict__['_recoded'] = {}
+            try:
+                return cache[s, encoding]
+            except KeyError:
+                fixed = cache[s, encoding] = s.encode('latin1').decode(encoding)
+                return fixed
         elif isinstance(s, bytes):  # Python 2 WSGI
             return s.decode(encoding or self.input_encoding)
         else:
@@ -2258,42 +2617,62 @@ class FormsDict(MultiDict):
             return super(FormsDict, self).__getattr__(name)
         return self.getunicode(name, default=default)
 
+
+class _QueryFormsDict(FormsDict):
+    """ A :class:`FormsDict` that parses its url-encoded source string on
+        first access, so requests that never look at it don't pay for it. """
+
+    def __init__(self, source):
+        self._source = source
+
+    @cached_property
+    def _data(self):
+        self.__dict__['_data'] = data = {}
+        for key, value in _parse_qsl(self._source):
+            self.append(key, value)
+        return data
+
+
 class HeaderDict(MultiDict):
     """ A case-insensitive version of :class:`MultiDict` that defaults to
         replace the old value instead of appending it. """
 
     def __init__(self, *a, **ka):
-        self.dict = {}
+        self._data = {}
         if a or ka: self.update(*a, **ka)
 
+    # Values are always lists here: :attr:`BaseResponse.headers` shares them
+    # with the response.
+    _lists = True
+
     def __contains__(self, key):
-        return _hkey(key) in self.dict
+        return _hkey(key) in self._data
 
     def __delitem__(self, key):
-        del self.dict[_hkey(key)]
+        del self._data[_hkey(key)]
 
     def __getitem__(self, key):
-        return self.dict[_hkey(key)][-1]
+        return self._data[_hkey(key)][-1]
 
     def __setitem__(self, key, value):
-        self.dict[_hkey(key)] = [_hval(value)]
+        self._data[_hkey(key)] = [_hval(value)]
 
     def append(self, key, value):
-        self.dict.setdefault(_hkey(key), []).append(_hval(value))
+        self._data.setdefault(_hkey(key), []).append(_hval(value))
 
     def replace(self, key, value):
-        self.dict[_hkey(key)] = [_hval(value)]
+        self._data[_hkey(key)] = [_hval(value)]
 
     def getall(self, key):
-        return self.dict.get(_hkey(key)) or []
+        return self._data.get(_hkey(key)) or []
 
     def get(self, key, default=None, index=-1):
         return MultiDict.get(self, _hkey(key), default, index)
 
     def filter(self, names):
         for name in (_hkey(n) for n in names):
-            if name in self.dict:
-                del self.dict[name]
+            if name in self._data:
+                del self._data[name]
 
 
 class WSGIHeaderDict(DictMixin):
@@ -2315,10 +2694,16 @@ class WSGIHeaderDict(DictMixin):
 
     def _ekey(self, key):
         """ Translate header field name to CGI/WSGI environ key. """
-        key = key.replace('-', '_').upper()
-        if key in self.cgikeys:
-            return key
-        return 'HTTP_' + key
+        try:
+            return _ekey_cache[key]
+        except KeyError:
+            pass
+        ekey = key.replace('-', '_').upper()
+        if ekey not in self.cgikeys:
+            ekey = 'HTTP_' + ekey
+        if len(_ekey_cache) < 512:
+            _ekey_cache[key] = ekey
+        return ekey
 
     def raw(self, key, default=None):
         """ Return the header value as is (may be bytes or unicode). """
@@ -2328,7 +2713,8 @@ class WSGIHeaderDict(DictMixin):
         val = self.environ[self._ekey(key)]
         if py3k:
             if isinstance(val, unicode):
-                val = val.encode('latin1').decode('utf8')
+                if not _isascii(val):
+                    val = val.encode('latin1').decode('utf8')
             else:
                 val = val.decode('utf8')
         return val
@@ -2350,11 +2736,19 @@ class WSGIHeaderDict(DictMixin):
         return [x for x in self]
 
     def __len__(self):
-        return len(self.keys())
+        return sum(1 for key in self.environ
+                   if key[:5] == 'HTTP_' or key in self.cgikeys)
 
     def __contains__(self, key):
         return self._ekey(key) in self.environ
 
+#: Header names seen by :meth:`WSGIHeaderDict._ekey`, shared by all requests.
+_ekey_cache = {}
+
+#: Input encodings that decode ASCII-only text to itself.
+_ascii_compatible = frozenset(('utf8', 'utf-8', 'UTF-8', 'latin1', 'latin-1',
+                               'iso-8859-1', 'ISO-8859-1', 'ascii'))
+
 _UNSET = object()
 
 class ConfigDict(dict):
@@ -2622,10 +3016,36 @@ class AppStack(list):
 
 
 class WSGIFileWrapper(object):
-    def __init__(self, fp, buffer_size=1024 * 64):
+    """ Iterate over a file-like object in chunks of `buffer_size`.
+
+        If `offset` and/or `length` are given, the file is positioned at
+        `offset` and only `length` bytes are returned. Both are kept as
+        attributes, together with `fp` and `fileno`, so that servers can hand
+        the byte range to ``os.sendfile`` (or ``socket.sendfile``) instead of
+        copying it through Python. Servers that do not know about this still
+        get the correct bytes by iterating or calling :meth:`read`.
+    """
+
+    def __init__(self, fp, buffer_size=1024 * 64, offset=None, length=None):
         self.fp, self.buffer_size = fp, buffer_size
         for attr in 'fileno', 'close', 'read', 'readlines', 'tell', 'seek':
             if hasattr(fp, attr): setattr(self, attr, getattr(fp, attr))
+        self.offset, self.length = offset, length
+        if offset is not None:
+            fp.seek(offset)
+        if length is not None:
+            self._remaining = length
+            self.read = self._read_range
+            self.__dict__.pop('readlines', None)
+
+    def _read_range(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        if size <= 0:
+            return b''
+        part = self.fp.read(size)
+        self._remaining -= len(part)
+        return part
 
     def __iter__(self):
         buff, read = self.buffer_size, self.read
@@ -2836,12 +3256,274 @@ def _rangeiter(fp, offset, limit, bufsize=1024 * 1024):
         yield part
 
 
+#: Requests for more byte ranges than this (after merging) are answered with a
+#: single range that covers all of them, so lots of tiny parts can't inflate a
+#: response with part headers (RFC 9110, 14.2).
+MAX_RANGE_PARTS = 32
+
+
+def _merge_ranges(ranges):
+    """ Coalesce overlapping or touching byte ranges (RFC 7233, 4.1). The
+        requested order is kept unless ranges actually had to be merged. """
+    ordered = sorted(ranges)
+    merged = ordered[:1]
+    for start, end in ordered[1:]:
+        if start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return ranges if len(merged) == len(ranges) else merged
+
+
+def _multipart_ranges(fp, ranges, clen, mimetype):
+    """ Return (boundary, content_length, body) for a multipart/byteranges
+        response. The body is a generator that reads each range from fp. """
+    boundary = hashlib.sha1(os.urandom(32)).hexdigest()
+    heads = []
+    for i, (offset, end) in enumerate(ranges):
+        head = '%s--%s\r\n' % ('\r\n' if i else '', boundary)
+        if mimetype:
+            head += 'Content-Type: %s\r\n' % mimetype
+        head += 'Content-Range: bytes %d-%d/%d\r\n\r\n' % (offset, end - 1, clen)
+        heads.append(tob(head))
+    tail = tob('\r\n--%s--\r\n' % boundary)
+    length = sum(map(len, heads)) + len(tail) + sum(e - o for o, e in ranges)
+
+    def iterparts():
+        for head, (offset, end) in zip(heads, ranges):
+            yield head
+            for part in _rangeiter(fp, offset, end - offset):
+                yield part
+        yield tail
+
+    return boundary, length, iterparts()
+
+
+class StaticFileCache(object):
+    """ A bounded cache for the file metadata :func:`static_file` needs on
+        every request (existence and access checks, :func:`os.stat`, guessed
+        mime-type and generated ETag), keyed by the resolved file path.
+
+        Entries expire after `ttl` seconds, so changes on disk are picked up
+        with that much delay. Call :meth:`invalidate` after changing files to
+        make them visible immediately. Conditional requests for a cached file
+        are answered without touching the file system at all.
+
+        :param maxsize: Maximum number of cached files (least recently used
+            entries are dropped first).
+        :param ttl: Seconds an entry stays valid. ``None`` keeps entries until
+            they are invalidated or pushed out.
+    """
+
+    def __init__(self, maxsize=1024, ttl=2.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, filename):
+        """ Return the (size, mtime, etag, guessed_type) tuple for a file or
+            None if it is unknown or expired. """
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] < time.time():
+                del self._entries[filename]
+                return None
+            self._entries.pop(filename)
+            self._entries[filename] = entry
+            return entry[1]
+
+    def put(self, filename, meta):
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries.pop(filename, None)
+            self._entries[filename] = (expires, meta)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, filename=None):
+        """ Forget a single file (by resolved path) or everything. """
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(filename, None)
+
+
+class CompressionCache(object):
+    """ An on-disk cache of compressed copies of static files, used by
+        :func:`static_file` to compress text assets on the fly. Each file is
+        compressed once per ETag and encoding; later requests are served from
+        the cached copy. Least recently used copies are deleted once the cache
+        grows beyond `maxsize` bytes.
+
+        ``gzip`` is always available. ``br`` is offered if the third-party
+        ``brotli`` module is installed.
+
+        :param root: Cache directory. Existing copies in it are reused.
+            (default: a new temporary directory)
+        :param maxsize: Upper limit for the total size of the cache in bytes.
+        :param minsize: Files smaller than this are not worth compressing.
+        :param level: Compression level (1-9 for gzip, 0-11 for brotli).
+    """
+
+    #: Mime-types (besides ``text/*``) that compress well.
+    compressible = {'application/javascript', 'application/json',
+                    'application/xml', 'application/wasm', 'image/svg+xml',
+                    'application/x-ndjson', 'application/manifest+json'}
+
+    def __init__(self, root=None, maxsize=64 * 1024 * 1024, minsize=1024,
+                 level=6):
+        self.root = root or tempfile.mkdtemp(prefix='bottle-compress-')
+        self.maxsize, self.minsize, self.level = maxsize, minsize, level
+        self._files = OrderedDict()  # Cache file name -> size
+        self._total = 0
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root)
+        known = []
+        for name in os.listdir(self.root):
+            if name.endswith(('.gz', '.br')):
+                stats = os.stat(os.path.join(self.root, name))
+                known.append((stats.st_mtime, name, stats.st_size))
+        for _, name, size in sorted(known):
+            self._files[name] = size
+            self._total += size
+        try:
+            import brotli
+            self._brotli = brotli
+            self.encodings = ('br', 'gzip')
+        except ImportError:
+            self._brotli = None
+            self.encodings = ('gzip',)
+
+    def accepts(self, mimetype, size):
+        """ True if a file of this type and size should be compressed. """
+        if not mimetype or size < self.minsize:
+            return False
+        mimetype = mimetype.split(';')[0].strip()
+        return mimetype[:5] == 'text/' or mimetype in self.compressible
+
+    def get(self, filename, etag, encoding):
+        """ Return (path, size) of the compressed copy of `filename`, creating
+            it first if needed. """
+        name = '%s.%s' % (hashlib.sha1(tob(etag + filename)).hexdigest(),
+                          'br' if encoding == 'br' else 'gz')
+        path = os.path.join(self.root, name)
+        with self._lock:
+            size = self._files.pop(name, None)
+            if size is not None:
+                self._files[name] = size
+        if size is not None and os.path.exists(path):
+            return path, size
+        size = self._compress(filename, path, encoding)
+        with self._lock:
+            self._total -= self._files.pop(name, 0)
+            self._files[name] = size
+            self._total += size
+            while self._total > self.maxsize and len(self._files) > 1:
+                old, oldsize = self._files.popitem(last=False)
+                self._total -= oldsize
+                try:
+                    os.remove(os.path.join(self.root, old))
+                except OSError:
+                    pass
+        return path, size
+
+    def _compress(self, filename, path, encoding):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with open(filename, 'rb') as src, os.fdopen(fd, 'wb') as out:
+                chunks = iter(lambda: src.read(1024 * 64), b'')
+                if encoding == 'br':
+                    compressor = self._brotli.Compressor(quality=self.level)
+                    for chunk in chunks:
+                        out.write(compressor.process(chunk))
+                    out.write(compressor.finish())
+                else:
+                    with gzip.GzipFile(fileobj=out, mode='wb', mtime=0,
+                                       compresslevel=self.level) as gz:
+                        for chunk in chunks:
+                            gz.write(chunk)
+            getattr(os, 'replace', os.rename)(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return os.path.getsize(path)
+
+
+#: File name suffixes of precompressed siblings, see :func:`static_file`.
+_ENCODING_SUFFIX = {'br': '.br', 'gzip': '.gz'}
+
+
+def _accepted_encodings(header, offered):
+    """ Return the encodings from `offered` that an ``Accept-Encoding`` header
+        allows, best first. Ties keep the order of `offered`. """
+    quality = {}
+    for value, params in _parse_http_header(header):
+        try:
+            quality[value.lower()] = float(params.get('q', 1))
+        except ValueError:
+            continue
+    fallback = quality.get('*', 0)
+    ranked = [(-quality.get(enc, fallback), i, enc)
+              for i, enc in enumerate(offered)]
+    return [enc for q, i, enc in sorted(ranked) if q < 0]
+
+
+def _guess_mimetype(name):
+    mimetype, encoding = mimetypes.guess_type(name)
+    if encoding == 'gzip':
+        mimetype = 'application/gzip'
+    elif encoding: # e.g. bzip2 -> application/x-bzip2
+        mimetype = 'application/x-' + encoding
+    return mimetype
+
+
+def _variant_meta(filename, cache):
+    """ Like :func:`_static_meta`, but for optional files: returns None
+        (and remembers that in the cache) if the file is not available. """
+    meta = cache.get(filename) if cache is not None else None
+    if meta is None:
+        meta = _static_meta(filename)
+        if isinstance(meta, HTTPError):
+            meta = False
+        if cache is not None:
+            cache.put(filename, meta)
+    return meta or None
+
+
+def _static_meta(filename):
+    """ Collect the file metadata used by :func:`static_file`. Returns an
+        HTTPError instead if the file can't be served. """
+    if not os.path.exists(filename) or not os.path.isfile(filename):
+        return HTTPError(404, "File does not exist.")
+    if not os.access(filename, os.R_OK):
+        return HTTPError(403, "You do not have permission to access this file.")
+    stats = os.stat(filename)
+    etag = '%d:%d:%d:%d:%s' % (stats.st_dev, stats.st_ino, stats.st_mtime,
+                               stats.st_size, filename)
+    etag = hashlib.sha1(tob(etag)).hexdigest()
+    return stats.st_size, stats.st_mtime, etag, _guess_mimetype(filename)
+
+
 def static_file(filename, root,
                 mimetype=True,
                 download=False,
                 charset='UTF-8',
                 etag=None,
-                headers=None):
+                headers=None,
+                cache=None,
+                precompressed=False,
+                compress=None):
     """ Open a file in a safe way and return an instance of :exc:`HTTPResponse`
         that can be sent back to the client.
 
@@ -2859,6 +3541,13 @@ def static_file(filename, root,
         :param etag: Provide a pre-computed ETag header. If set to ``False``,
             ETag handling is disabled. (default: auto-generate ETag header)
         :param headers: Additional headers dict to add to the response.
+        :param cache: A :class:`StaticFileCache` to remember file metadata
+            between requests. (default: no caching)
+        :param precompressed: If True, serve ``filename.br`` or ``filename.gz``
+            instead of the file itself if the client accepts that encoding and
+            the sibling is not older than the file. (default: False)
+        :param compress: A :class:`CompressionCache` to compress text assets
+            on the fly for clients that accept it. (default: no compression)
 
         While checking user input is always a good idea, this function provides
         additional protection against malicious ``filename`` parameters from
@@ -2871,8 +3560,12 @@ def static_file(filename, root,
         ``If-None-Match``) are answered with ``304 Not Modified`` whenever
         possible. ``HEAD`` and ``Range`` requests (used by download managers to
         check or continue partial downloads) are also handled automatically.
+        Requests for several ranges at once get a single
+        ``multipart/byteranges`` response that is streamed from the file.
     """
 
+    retry = (filename, root, mimetype, download, charset, etag, headers)
+    options = dict(cache=cache, precompressed=precompressed, compress=compress)
     root = os.path.join(os.path.abspath(root), '')
     filename = os.path.abspath(os.path.join(root, filename.strip('/\\')))
     headers = headers.copy() if headers else {}
@@ -2880,18 +3573,23 @@ def static_file(filename, root,
 
     if not filename.startswith(root):
         return HTTPError(403, "Access denied.")
-    if not os.path.exists(filename) or not os.path.isfile(filename):
-        return HTTPError(404, "File does not exist.")
-    if not os.access(filename, os.R_OK):
-        return HTTPError(403, "You do not have permission to access this file.")
+
+    meta = cache.get(filename) if cache is not None else None
+    cached = bool(meta)
+    if not meta:
+        meta = _static_meta(filename)
+        if isinstance(meta, HTTPError):
+            return meta
+        if cache is not None:
+            cache.put(filename, meta)
+    clen, mtime, auto_etag, guessed = meta
+    mtime_check = mtime
 
     if mimetype is True:
-        name = download if isinstance(download, str) else filename
-        mimetype, encoding = mimetypes.guess_type(name)
-        if encoding == 'gzip':
-            mimetype = 'application/gzip'
-        elif encoding: # e.g. bzip2 -> application/x-bzip2
-            mimetype = 'application/x-' + encoding
+        if isinstance(download, str):
+            mimetype = _guess_mimetype(download)
+        else:
+            mimetype = guessed
 
     if charset and mimetype and 'charset=' not in mimetype \
         and (mimetype[:5] == 'text/' or mimetype == 'application/javascript'):
@@ -2907,15 +3605,32 @@ def static_file(filename, root,
         download = download.replace('"','')
         headers['Content-Disposition'] = 'attachment; filename="%s"' % download
 
-    stats = os.stat(filename)
-    headers['Content-Length'] = clen = stats.st_size
-    headers['Last-Modified'] = email.utils.formatdate(stats.st_mtime, usegmt=True)
+    serve, size, encoding = filename, clen, None
+    if precompressed or compress is not None:
+        headers['Vary'] = 'Accept-Encoding'
+        accept = getenv('HTTP_ACCEPT_ENCODING')
+        offered = ('br', 'gzip') if precompressed else compress.encodings
+        for enc in _accepted_encodings(accept, offered) if accept else ():
+            if precompressed:
+                variant = _variant_meta(filename + _ENCODING_SUFFIX[enc], cache)
+                if variant and variant[1] >= mtime:
+                    serve, encoding = filename + _ENCODING_SUFFIX[enc], enc
+                    size, mtime_check = variant[0], variant[1]
+                    break
+            if compress is not None and enc in compress.encodings \
+                    and compress.accepts(guessed, clen):
+                encoding, cached = enc, False  # Created after the 304 checks.
+                break
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            auto_etag += '-' + encoding
+
+    headers['Content-Length'] = size
+    headers['Last-Modified'] = email.utils.formatdate(mtime, usegmt=True)
     headers['Date'] = email.utils.formatdate(time.time(), usegmt=True)
 
     if etag is None:
-        etag = '%d:%d:%d:%d:%s' % (stats.st_dev, stats.st_ino, stats.st_mtime,
-                                   clen, filename)
-        etag = hashlib.sha1(tob(etag)).hexdigest()
+        etag = auto_etag
 
     if etag:
         headers['ETag'] = etag
@@ -2926,22 +3641,50 @@ def static_file(filename, root,
     ims = getenv('HTTP_IF_MODIFIED_SINCE')
     if ims:
         ims = parse_date(ims.split(";")[0].strip())
-        if ims is not None and ims >= int(stats.st_mtime):
+        if ims is not None and ims >= int(mtime):
             return HTTPResponse(status=304, **headers)
 
-    body = '' if request.method == 'HEAD' else open(filename, 'rb')
+    if encoding and serve == filename:
+        serve, size = compress.get(filename, auto_etag, encoding)
+        headers['Content-Length'] = size
+
+    try:
+        body = '' if request.method == 'HEAD' else open(serve, 'rb')
+    except (IOError, OSError):
+        if not cached: raise
+        cache.invalidate(serve)  # Deleted or replaced since it was cached.
+        return static_file(*retry, **options)
+
+    if body and cached:
+        # Cached metadata may be stale; the open file is the truth.
+        stats = os.fstat(body.fileno())
+        if (stats.st_size, stats.st_mtime) != (size, mtime_check):
+            body.close()
+            cache.invalidate(filename)
+            cache.invalidate(serve)
+            return static_file(*retry, **options)
 
     headers["Accept-Ranges"] = "bytes"
     range_header = getenv('HTTP_RANGE')
     if range_header:
-        ranges = list(parse_range_header(range_header, clen))
+        ranges = list(parse_range_header(range_header, size))
         if not ranges:
             return HTTPError(416, "Requested Range Not Satisfiable")
+        if len(ranges) > 1:
+            ranges = _merge_ranges(ranges)
+        if len(ranges) > MAX_RANGE_PARTS:
+            ranges = [(min(r[0] for r in ranges), max(r[1] for r in ranges))]
+        if len(ranges) > 1:
+            boundary, rlen, parts = _multipart_ranges(body, ranges, size, mimetype)
+            headers["Content-Type"] = "multipart/byteranges; boundary=%s" % boundary
+            headers["Content-Length"] = str(rlen)
+            if body: body = _closeiter(parts, body.close)
+            return HTTPResponse(body, status=206, **headers)
         offset, end = ranges[0]
         rlen = end - offset
-        headers["Content-Range"] = "bytes %d-%d/%d" % (offset, end - 1, clen)
+        headers["Content-Range"] = "bytes %d-%d/%d" % (offset, end - 1, size)
         headers["Content-Length"] = str(rlen)
-        if body: body = _closeiter(_rangeiter(body, offset, rlen), body.close)
+        if body: body = WSGIFileWrapper(body, offset=offset, length=rlen)
         return HTTPResponse(body, status=206, **headers)
     return HTTPResponse(body, **headers)
 
@@ -3053,10 +3796,12 @@ def _parse_qsl(qs):
     r = []
     for pair in qs.split('&'):
         if not pair: continue
-        nv = pair.split('=', 1)
-        if len(nv) != 2: nv.append('')
-        key = urlunquote(nv[0].replace('+', ' '))
-        value = urlunquote(nv[1].replace('+', ' '))
+        key, _, value = pair.partition('=')
+        # Most keys and many values need no unquoting at all.
+        if '%' in key or '+' in key:
+            key = urlunquote(key.replace('+', ' '))
+        if '%' in value or '+' in value:
+            value = urlunquote(value.replace('+', ' '))
         r.append((key, value))
     return r
 
@@ -3248,101 +3993,132 @@ class _MultipartParser(object):
         if self.buffer_size - 6 < len(boundary):  # "--boundary--\r\n"
             raise MultipartError("Boundary does not fit into buffer_size.")
 
-    def _lineiter(self):
-        """ Iterate over a binary file-like object (crlf terminated) line by
-            line. Each line is returned as a (line, crlf) tuple. Lines larger
-            than buffer_size are split into chunks where all but the last chunk
-            has an empty string instead of crlf. Maximum chunk size is twice the
-            buffer size.
+    def _refill(self, buf, pos):
+        """ Drop the consumed part of buf and append the next chunk from the
+            stream. Returns None if the stream is exhausted.
         """
+        size = self.buffer_size
+        if self._remaining >= 0:
+            size = min(size, self._remaining)
+        chunk = self.stream.read(size) if size else b""
+        if not chunk:
+            return None
+        self._remaining -= len(chunk)
+        return buf[pos:] + chunk
 
-        read = self.stream.read
-        maxread, maxbuf = self.content_length, self.buffer_size
-        partial = b""  # Contains the last (partial) line
-
-        while True:
-            chunk = read(maxbuf if maxread < 0 else min(maxbuf, maxread))
-            maxread -= len(chunk)
-            if not chunk:
-                if partial:
-                    yield partial, b''
-                break
-
-            if partial:
-                chunk = partial + chunk
-
-            scanpos = 0
-            while True:
-                i = chunk.find(b'\r\n', scanpos)
-                if i >= 0:
-                    yield chunk[scanpos:i], b'\r\n'
-                    scanpos = i + 2
-                else: # CRLF not found
-                    partial = chunk[scanpos:] if scanpos else chunk
-                    break
-
-            if len(partial) > maxbuf:
-                yield partial[:-1], b""
-                partial = partial[-1:]
+    @staticmethod
+    def _boundary_kind(buf, end, eof):
+        """ Classify the bytes following a delimiter match at buf[end:]:
+            "next" for a part separator, "last" for the closing delimiter,
+            "more" if more data is needed to decide, or None if the match is
+            just part of the body.
+        """
+        tail = buf[end:end + 4]
+        if tail[:2] == b"\r\n" or (eof and not tail):
+            return "next"
+        if len(tail) < 4 and not eof:
+            return "more"
+        if tail[:2] == b"--" and (tail[2:] == b"\r\n" or len(tail) == 2):
+            return "last"
+        return None
 
     def parse(self):
         """ Return a MultiPart iterator. Can only be called once. """
 
-        lines, line = self._lineiter(), ""
-        separator = b"--" + tob(self.boundary)
-        terminator = separator + b"--"
+        # Instead of splitting the stream into lines, search large buffers for
+        # the CRLF-prefixed delimiter and hand everything before it to the
+        # part in one write. A leading CRLF is prepended so a boundary on the
+        # very first line is found the same way as all the others.
+        delimiter = b"\r\n--" + tob(self.boundary)
+        dlen = len(delimiter)
+        self._remaining = self.content_length
+        buf, pos, eof = b"\r\n", 0, False
         mem_used, disk_used = 0, 0  # Track used resources to prevent DoS
-        is_tail = False  # True if the last line was incomplete (cutted)
-
-        # Consume first boundary. Ignore any preamble, as required by RFC
-        # 2046, section 5.1.1.
-        for line, nl in lines:
-            if line in (separator, terminator):
-                break
-        else:
-            raise MultipartError("Stream does not contain boundary")
-
-        # First line is termainating boundary -> empty multipart stream
-        if line == terminator:
-            for _ in lines:
-                raise MultipartError("Found data after empty multipart stream")
-            return
-
         part_options = {
             "buffer_size": self.buffer_size,
             "memfile_limit": self.memfile_limit,
             "charset": self.charset,
         }
-        part = _MultipartPart(**part_options)
+        # No part until the first boundary: the preamble is ignored, as
+        # required by RFC 2046, section 5.1.1.
+        part, in_header = None, False
+        skip = 0  # Bytes at pos that belong to the header, not the body
 
-        for line, nl in lines:
-            if not is_tail and (line == separator or line == terminator):
-                part.finish()
-                if part.is_buffered():
-                    mem_used += part.size
+        try:
+            while True:
+                if in_header:
+                    # pos is at the CRLF that ends the previous line.
+                    end = buf.find(b"\r\n", pos + 2)
+                    if (end >= 0 or eof) and buf[pos:end if end >= 0 else None] \
+                            in (delimiter, delimiter + b"--"):
+                        part.finish()  # Boundary inside the header section
+                    if end < 0:
+                        line = buf[pos + 2:]
+                        if eof or len(line) > self.buffer_size:
+                            if line:
+                                part.feed(line, b"")
+                            raise MultipartError("Unexpected end of multipart stream.")
+                    else:
+                        part.feed(buf[pos + 2:end], b"\r\n")
+                        pos = end
+                        if part.file:  # Blank line, headers are complete.
+                            in_header, skip = False, 2
+                        continue
                 else:
-                    disk_used += part.size
-                yield part
-                if line == terminator:
-                    break
-                part = _MultipartPart(**part_options)
-            else:
-                is_tail = not nl  # The next line continues this one
-                try:
-                    part.feed(line, nl)
-                    if part.is_buffered():
-                        if part.size + mem_used > self.mem_limit:
-                            raise MultipartError("Memory limit reached.")
-                    elif part.size + disk_used > self.disk_limit:
-                        raise MultipartError("Disk limit reached.")
-                except MultipartError:
-                    part.close()
-                    raise
-        else:
-            part.close()
-
-        if line != terminator:
-            raise MultipartError("Unexpected end of multipart stream.")
+                    i = buf.find(delimiter, pos)
+                    kind = "more" if i < 0 else self._boundary_kind(buf, i + dlen, eof)
+                    if kind == "more":
+                        # Keep anything that may still turn out to be a delimiter.
+                        keep = i if i >= 0 else len(buf) if eof else max(pos, len(buf) - dlen + 1)
+                    elif kind is None:
+                        keep = i + dlen
+                    else:
+                        keep = i
+
+                    if part is not None and keep > pos + skip:
+                        part.write_body(memoryview(buf)[pos + skip:keep], b"")
+                        if part.is_buffered():
+                            if part.size + mem_used > self.mem_limit:
+                                raise MultipartError("Memory limit reached.")
+                        elif part.size + disk_used > self.disk_limit:
+                            raise MultipartError("Disk limit reached.")
+                    skip = max(0, pos + skip - keep)
+                    pos = keep
+
+                    if kind == "last" or kind == "next":
+                        if part is not None:
+                            part.finish()
+                            if part.is_buffered():
+                                mem_used += part.size
+                            else:
+                                disk_used += part.size
+                            done, part = part, None
+                            yield done
+                        elif kind == "last":
+                            # First delimiter is the closing one -> empty multipart stream
+                            if buf[i + dlen + 4:] or (not eof and self._refill(b"", 0)):
+                                raise MultipartError("Found data after empty multipart stream")
+                        if kind == "last":
+                            return
+                        part = _MultipartPart(**part_options)
+                        pos, in_header, skip = i + dlen, True, 0
+                        continue
+                    if kind is None:
+                        continue
+                    if eof:
+                        if part is None:
+                            raise MultipartError("Stream does not contain boundary")
+                        raise MultipartError("Unexpected end of multipart stream.")
+
+                more = self._refill(buf, pos)
+                if more is None:
+                    eof = True
+                else:
+                    buf, pos = more, 0
+        except MultipartError:
+            if part is not None:
+                part.close()
+            raise
 
 
 class _MultipartPart(object):
@@ -3388,7 +4164,9 @@ class _MultipartPart(object):
             return  # This does not even flush the buffer
 
         self.size += len(line) + len(self._buf)
-        self.file.write(self._buf + line)
+        if self._buf:
+            self.file.write(self._buf)
+        self.file.write(line)
         self._buf = nl
 
         if self.content_length > 0 and self.size > self.content_length:
@@ -3506,18 +4284,60 @@ class WSGIRefServer(ServerAdapter):
     def run(self, app):  # pragma: no cover
         from wsgiref.simple_server import make_server
         from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+        from wsgiref.simple_server import ServerHandler
         import socket
 
+        class SendfileHandler(ServerHandler):
+            wsgi_file_wrapper = WSGIFileWrapper
+
+            def sendfile(self):
+                wrapper = self.result
+                sock = self.request_handler.connection
+                try:
+                    wrapper.fileno()
+                except (AttributeError, OSError, ValueError):
+                    return False  # Not a real file. Iterate instead.
+                if not hasattr(sock, 'sendfile'):
+                    return False  # Python 2
+                if not self.headers_sent:
+                    self.bytes_sent = 0
+                    self.send_headers()
+                self._flush()
+                offset = wrapper.offset
+                if offset is None:
+                    offset = wrapper.fp.tell()
+                # Uses os.sendfile() where available and send() otherwise.
+                self.bytes_sent += sock.sendfile(wrapper.fp, offset, wrapper.length)
+                return True
+
         class FixedHandler(WSGIRequestHandler):
             def address_string(self):  # Prevent reverse DNS lookups please.
                 return self.client_address[0]
 
+            def handle(self):
+                # Same as WSGIRequestHandler.handle(), but with sendfile support.
+                self.raw_requestline = self.rfile.readline(65537)
+                if len(self.raw_requestline) > 65536:
+                    self.requestline = ''
+                    self.request_version = ''
+                    self.command = ''
+                    self.send_error(414)
+                    return
+                if not self.parse_request():
+                    return
+                handler = SendfileHandler(
+                    self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+                    multithread=getattr(self.server, 'multithread', False))
+                handler.request_handler = self
+                handler.run(self.server.get_app())
+
             def log_request(*args, **kw):
                 if not self.quiet:
                     return WSGIRequestHandler.log_request(*args, **kw)
 
         handler_cls = self.options.get('handler_class', FixedHandler)
         server_cls = self.options.get('server_class', WSGIServer)
+        sock = self.options.get('sock')
 
         if ':' in self.host:  # Fix wsgiref for IPv6 addresses.
             if getattr(server_cls, 'address_family') == socket.AF_INET:
@@ -3525,6 +4345,22 @@ class WSGIRefServer(ServerAdapter):
                 class server_cls(server_cls):
                     address_family = socket.AF_INET6
 
+        if sock is not None:  # Serve on an already listening socket.
+
+            class server_cls(server_cls):
+                address_family = sock.family
+
+                def server_bind(self):
+                    self.socket.close()
+                    self.socket = sock
+                    self.server_address = sock.getsockname()
+                    self.server_name = self.server_address[0]
+                    self.server_port = self.server_address[1]
+                    self.setup_environ()
+
+                def server_activate(self):
+                    pass
+
         self.srv = make_server(self.host, self.port, app, server_cls,
                                handler_cls)
         self.port = self.srv.server_port  # update port actual port (0 means random)
@@ -3535,6 +4371,88 @@ class WSGIRefServer(ServerAdapter):
             raise
 
 
+class ThreadedWSGIRefServer(WSGIRefServer):
+    """ :class:`WSGIRefServer` with a fixed pool of `workers` threads
+        (default: 16), so one slow request no longer blocks all others.
+
+        Accepted connections wait in a queue of at most `queue` entries
+        (default: 64). When it is full, new connections are answered with
+        ``503 Service Unavailable`` right away instead of piling up. Each
+        connection's socket gets a `timeout` (default: 30 seconds), so a
+        stalled client frees its worker. Other options are the same as for
+        :class:`WSGIRefServer`.
+    """
+
+    def run(self, app):  # pragma: no cover
+        try:
+            import socketserver, queue
+        except ImportError:  # Python 2
+            import SocketServer as socketserver, Queue as queue
+        import socket
+        from wsgiref.simple_server import WSGIServer
+
+        workers = int(self.options.get('workers', 16))
+        backlog = int(self.options.get('queue', 64))
+        timeout = self.options.get('timeout', 30)
+        base = self.options.get('server_class', WSGIServer)
+        busy = tob('HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\n'
+                   'Content-Type: text/plain\r\nContent-Length: 19\r\n'
+                   'Connection: close\r\n\r\nService Unavailable')
+
+        class PooledWSGIServer(socketserver.ThreadingMixIn, base):
+            multithread = True
+            daemon_threads = True
+
+            def __init__(self, *args, **kwargs):
+                base.__init__(self, *args, **kwargs)
+                self.pending = queue.Queue(backlog)
+                self.workers = []
+                for _ in range(workers):
+                    worker = threading.Thread(target=self.work)
+                    worker.daemon = True
+                    worker.start()
+                    self.workers.append(worker)
+
+            def work(self):
+                while True:
+                    item = self.pending.get()
+                    if item is None:
+                        break
+                    self.process_request_thread(*item)
+
+            def process_request(self, request, client_address):
+                if timeout is not None:
+                    request.settimeout(float(timeout))
+                try:
+                    self.pending.put_nowait((request, client_address))
+                except queue.Full:
+                    self.reject(request)
+
+            def reject(self, request):
+                try:
+                    request.setblocking(False)
+                    request.sendall(busy)
+                    request.recv(65536)  # Closing with unread data would reset.
+                except (OSError, socket.error):
+                    pass
+                self.shutdown_request(request)
+
+            def handle_error(self, request, client_address):
+                if not isinstance(sys.exc_info()[1], (socket.timeout, socket.error)):
+                    base.handle_error(self, request, client_address)
+
+            def server_close(self):
+                base.server_close(self)
+                for _ in getattr(self, 'workers', ()):
+                    try:
+                        self.pending.put_nowait(None)
+                    except queue.Full:
+                        break  # Workers are daemon threads; they die with us.
+
+        self.options['server_class'] = PooledWSGIServer
+        WSGIRefServer.run(self, app)
+
+
 class CherryPyServer(ServerAdapter):
     def run(self, handler):  # pragma: no cover
         depr(0, 13, "The wsgi server part of cherrypy was split into a new "
@@ -3803,6 +4721,756 @@ class AiohttpUVLoopServer(AiohttpServer):
         import uvloop
         return uvloop.new_event_loop()
 
+
+class _AsyncioInput(object):
+    """ ``wsgi.input`` for request bodies that :class:`AsyncioServer` streams
+        to the application instead of buffering them. Reads block the worker
+        thread until the event loop has received data and, like a socket, may
+        return fewer bytes than requested. """
+
+    def __init__(self, conn, high_water):
+        self._conn = conn
+        self._buf = bytearray()
+        self._eof = self._waiting = self._paused = False
+        self._high = high_water
+        self._cond = threading.Condition()
+
+    def feed(self, data):
+        """ Add received data (event loop). Returns True if the connection
+            should stop reading until the application catches up. """
+        with self._cond:
+            self._buf += data
+            self._cond.notify()
+            if len(self._buf) > self._high and not self._paused:
+                self._paused = True
+            return self._paused
+
+    def feed_eof(self):
+        with self._cond:
+            self._eof = True
+            self._cond.notify()
+
+    def _take(self, size, sep=None):
+        with self._cond:
+            while True:
+                n = len(self._buf)
+                if sep is not None and not self._eof:
+                    n = self._buf.find(sep) + 1 or (n if 0 <= size <= n else 0)
+                if n or self._eof:
+                    break
+                if not self._waiting:
+                    self._waiting = True
+                    self._conn.loop.call_soon_threadsafe(self._conn.body_wanted, self)
+                self._cond.wait()
+            self._waiting = False
+            if 0 <= size < n:
+                n = size
+            data = bytes(self._buf[:n])
+            del self._buf[:n]
+            if self._paused and len(self._buf) <= self._high // 2:
+                self._paused = False
+                self._conn.loop.call_soon_threadsafe(self._conn.body_drained, self)
+            return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return tob('').join(iter(functools.partial(self._take, 1024 * 64), tob('')))
+        return self._take(size) if size else tob('')
+
+    def readline(self, size=-1):
+        return self._take(-1 if size is None else size, tob('\n')) if size != 0 else tob('')
+
+
+class _AsyncioConnection(object):
+    """ Protocol for one client connection of :class:`AsyncioServer`.
+
+        Requests are parsed on the event loop and answered one at a time,
+        so pipelined requests simply wait in the receive buffer. Only the
+        application itself runs on the thread pool (see :meth:`respond`). """
+
+    #: Seconds a connection is kept half-open to drop the rest of a large
+    #: request body that the application did not read.
+    linger = 2.0
+
+    def __init__(self, server, app, loop, pool):
+        self.server, self.app, self.loop, self.pool = server, app, loop, pool
+        self.transport = self.timer = self.deadline = None
+        self.buffer = bytearray()
+        self.closed = self.busy = self.client_eof = self.headers_sent = False
+        self.lingering = False  # Response sent, dropping the rest of a body.
+        self.writable = threading.Event()  # Cleared while the client lags behind.
+        self.writable.set()
+        self.waiting = None  # (environ, length) while a small body is buffered
+        self.input = None  # _AsyncioInput of a streamed request body
+        self.body_left = 0  # Bytes of that body not yet received (-1: chunked)
+
+    # asyncio protocol callbacks
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=self.server.max_buffer)
+        peer = transport.get_extra_info('peername')
+        self.peer = peer[0] if isinstance(peer, tuple) else ''
+        self.set_timeout(self.server.keepalive)
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if self.input is not None:
+            self.input.feed_eof()
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.writable.set()
+
+    def eof_received(self):
+        self.client_eof = True
+        if self.input is not None:
+            self.input.feed_eof()
+        # Half-closed clients still get the response they are waiting for.
+        return self.busy
+
+    def pause_writing(self):
+        self.writable.clear()
+        self.set_timeout(self.server.timeout)
+
+    def resume_writing(self):
+        self.set_timeout(None)
+        self.writable.set()
+
+    def data_received(self, data):
+        if self.lingering:
+            return
+        if self.body_left:
+            data = self.feed_body(data)
+        self.buffer += data
+        if not self.busy:
+            self.parse()
+        elif len(self.buffer) > self.server.max_header + self.server.max_buffer:
+            self.transport.pause_reading()  # Too much pipelined ahead.
+
+    # Timeouts
+
+    def set_timeout(self, seconds):
+        """ Close the connection unless it makes progress within `seconds`
+            (None: no limit, e.g. while the application runs). """
+        if seconds is None:
+            self.deadline = None
+            return
+        self.deadline = self.loop.time() + seconds
+        if self.timer is not None and self.timer.when() > self.deadline:
+            self.timer.cancel()
+            self.timer = None
+        if self.timer is None and not self.closed:
+            self.timer = self.loop.call_at(self.deadline, self.check_timeout)
+
+    def check_timeout(self):
+        self.timer = None
+        if self.deadline is None or self.closed:
+            return
+        if self.loop.time() < self.deadline:
+            self.timer = self.loop.call_at(self.deadline, self.check_timeout)
+        else:
+            self.transport.abort()
+
+    # Request side
+
+    def parse(self):
+        buf = self.buffer
+        if self.waiting is not None:
+            environ, length = self.waiting
+            if len(buf) < length:
+                return self.set_timeout(self.server.timeout)
+            self.waiting = None
+            environ['wsgi.input'] = BytesIO(bytes(buf[:length]))
+            del buf[:length]
+            return self.dispatch(environ)
+        while buf[:2] == tob('\r\n'):
+            del buf[:2]  # Empty lines before a request are allowed (RFC 7230 3.5).
+        end = buf.find(tob('\r\n\r\n'))
+        if end < 0 or end > self.server.max_header:
+            if len(buf) > self.server.max_header:
+                return self.reject('431 Request Header Fields Too Large')
+            if buf:
+                self.set_timeout(self.server.timeout)
+            return
+        head = bytes(buf[:end])
+        del buf[:end + 4]
+        try:
+            environ = self.make_environ(head)
+        except ValueError as e:
+            return self.reject(e.args[0])
+
+        version, connection = environ['SERVER_PROTOCOL'], environ.get('HTTP_CONNECTION', '').lower()
+        self.keep = 'close' not in connection if version == 'HTTP/1.1' else 'keep-alive' in connection
+        te, length = environ.get('HTTP_TRANSFER_ENCODING'), environ.get('CONTENT_LENGTH')
+        if te is not None:
+            if length is not None:
+                return self.reject('400 Bad Request')
+            if te.lower() != 'chunked':
+                return self.reject('501 Not Implemented')
+            length = -1
+        elif length is not None:
+            if not length.isdigit():
+                return self.reject('400 Bad Request')
+            length = int(length)
+        if not length:
+            environ['wsgi.input'] = BytesIO()
+            return self.dispatch(environ)
+        if version == 'HTTP/1.1' and environ.get('HTTP_EXPECT', '').lower() == '100-continue' \
+        and (length < 0 or len(buf) < length):
+            self.transport.write(tob('HTTP/1.1 100 Continue\r\n\r\n'))
+        if 0 < length <= self.server.max_buffer:
+            # Small bodies are read before a worker thread is involved.
+            self.waiting = (environ, length)
+            return self.parse()
+        # Large (or chunked) bodies are streamed into the application.
+        self.input = _AsyncioInput(self, self.server.max_buffer)
+        self.body_left = length
+        environ['wsgi.input'] = self.input
+        rest = self.feed_body(bytes(buf))
+        buf[:] = rest
+        self.dispatch(environ)
+
+    def make_environ(self, head):
+        lines = head.decode('latin1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise ValueError('400 Bad Request')
+        if version not in ('HTTP/1.0', 'HTTP/1.1'):
+            raise ValueError('505 HTTP Version Not Supported'
+                             if version.startswith('HTTP/') else '400 Bad Request')
+        if not target.startswith('/') and target != '*':
+            target = '/' + (target.split('/', 3)[3:] or [''])[0]  # absolute-form
+        path, _, query = target.partition('?')
+        environ = self.server.base_environ.copy()
+        environ['REQUEST_METHOD'] = method
+        environ['PATH_INFO'] = urlunquote(path)
+        environ['QUERY_STRING'] = query
+        environ['SERVER_PROTOCOL'] = version
+        environ['REMOTE_ADDR'] = self.peer
+        environ['bottle.raw_request_line'] = lines[0]
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if not sep or not name or name != name.strip():
+                raise ValueError('400 Bad Request')  # Also rejects obs-fold.
+            if '_' in name:
+                continue  # Would be indistinguishable from a '-' header.
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+            value = value.strip(' \t')
+            if key in environ:
+                if key == 'CONTENT_LENGTH' and environ[key] != value:
+                    raise ValueError('400 Bad Request')
+                if key != 'CONTENT_LENGTH':
+                    value = environ[key] + ',' + value
+            environ[key] = value
+        return environ
+
+    def feed_body(self, data):
+        """ Pass data of a streamed request body to its reader and return the
+            rest (the start of the next pipelined request). """
+        if self.body_left > 0:
+            data, rest = data[:self.body_left], data[self.body_left:]
+            self.body_left -= len(data)
+        else:
+            rest = tob('')
+        if self.input is not None:  # Otherwise the response is done; discard.
+            if data and self.input.feed(data):
+                self.transport.pause_reading()
+            if not self.body_left:
+                self.input.feed_eof()
+        if self.busy:
+            self.set_timeout(None)
+        else:
+            self.set_timeout(self.server.timeout if self.body_left else self.server.keepalive)
+        return rest
+
+    def body_wanted(self, reader):
+        # A worker is blocked on the request body: the client has to send it.
+        if reader is self.input and self.body_left and not self.closed:
+            self.set_timeout(self.server.timeout)
+
+    def body_drained(self, reader):
+        if reader is self.input and not self.closed:
+            self.transport.resume_reading()
+
+    def reject(self, status):
+        self.keep = False
+        body = tob(status)
+        self.transport.write(tob('HTTP/1.1 %s\r\nContent-Length: %d\r\nContent-Type: text/plain\r\n'
+                                 'Connection: close\r\n\r\n' % (status, len(body))) + body)
+        self.transport.close()
+
+    # Response side
+
+    def dispatch(self, environ):
+        self.busy = True
+        self.environ = environ
+        self.sent = 0
+        self.set_timeout(None)
+        self.loop.run_in_executor(self.pool, self.respond, environ)
+
+    def respond(self, environ):
+        """ Run the application and iterate its response (worker thread).
+
+            Everything for one response happens on this thread, as apps may
+            rely on thread-locals. Chunks are handed to the event loop as they
+            come; the thread only waits if the client falls more than the
+            write buffer behind. Lists and file wrappers are handed over
+            whole and never wait at all. """
+        call = self.loop.call_soon_threadsafe
+        state, chunks, handed = [], [], []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info:
+                try:
+                    if self.headers_sent:
+                        _raise(*exc_info)
+                finally:
+                    exc_info = None
+            elif state:
+                raise AssertionError('Headers already set!')
+            state[:] = [status, list(headers)]
+            return write
+
+        def write(data):
+            # Collected until the response is handed to the event loop, then
+            # sent like any other chunk of a streamed body.
+            if not handed:
+                chunks.append(data)
+            elif data:
+                send(data)
+
+        def send(data):
+            if not self.writable.is_set():
+                self.writable.wait()
+            if not self.closed:
+                call(self.write, [data])
+
+        def start(*args):
+            handed.append(True)
+            call(self.start, state[0], state[1], *args)
+
+        result = None
+        try:
+            result = self.app(environ, start_response)
+            if isinstance(result, (list, tuple)):
+                return start(chunks + list(result))
+            if isinstance(result, WSGIFileWrapper) and state:
+                result, wrapper = None, result  # Closed by the event loop.
+                return start(chunks, wrapper)
+            it = iter(result)
+            for chunk in it:  # start_response() may wait for the first chunk.
+                if chunk:
+                    chunks.append(chunk)
+                    break
+            else:
+                return start(chunks)
+            self.headers_sent = True
+            start(chunks, it)
+            for chunk in it:
+                if self.closed:
+                    break
+                if chunk:
+                    send(chunk)
+            call(self.end)
+        except Exception:
+            print_exc()
+            if self.headers_sent:
+                call(self.abort)  # Too late for an error page.
+            else:
+                body = tob('Internal Server Error')
+                call(self.start, '500 Internal Server Error', [('Content-Type', 'text/plain'),
+                     ('Content-Length', str(len(body)))], [body])
+        finally:
+            if hasattr(result, 'close'):
+                try:
+                    result.close()
+                except Exception:
+                    print_exc()
+
+    def start(self, status, headers, chunks, body=None):
+        """ Send the status line, headers and first chunks (event loop).
+            `body` is the iterator still feeding :meth:`write`, or a
+            :class:`WSGIFileWrapper` to send with ``loop.sendfile()``. """
+        if self.closed:
+            if isinstance(body, WSGIFileWrapper):
+                self.finish(body)
+            return
+        self.status = status
+        names = set(name.lower() for name, _ in headers)
+        code = int(status[:3])
+        self.chunked = self.discard = False
+        if self.environ['REQUEST_METHOD'] == 'HEAD' or code < 200 or code in (204, 304):
+            chunks, self.discard = [], True
+        elif 'content-length' not in names:
+            if body is None:
+                headers.append(('Content-Length', str(sum(map(len, chunks)))))
+            elif self.environ['SERVER_PROTOCOL'] == 'HTTP/1.1' and 'transfer-encoding' not in names:
+                headers.append(('Transfer-Encoding', 'chunked'))
+                self.chunked = True
+            else:
+                self.keep = False  # The end of the body is the end of the connection.
+        if self.body_left < 0 or self.client_eof:
+            self.keep = False  # We can't tell where an unread chunked body ends.
+        elif self.body_left > self.server.max_buffer:
+            self.keep = False  # Not worth receiving a large body only to drop it.
+        if 'connection' in names:
+            self.keep = self.keep and not any(v.lower() == 'close' for n, v in headers
+                                              if n.lower() == 'connection')
+        elif not self.keep:
+            headers.append(('Connection', 'close'))
+        elif self.environ['SERVER_PROTOCOL'] == 'HTTP/1.0':
+            headers.append(('Connection', 'keep-alive'))
+        if 'date' not in names:
+            headers.append(('Date', self.server.http_date()))
+        head = 'HTTP/1.1 %s\r\n%s\r\n' % (status, ''.join(['%s: %s\r\n' % h for h in headers]))
+        self.headers_sent = True
+        self.write(chunks, head.encode('latin1'))
+        if isinstance(body, WSGIFileWrapper):
+            if self.discard:
+                return self.finish(body)
+            if self.chunked or not hasattr(self.loop, 'sendfile'):
+                return self.pool.submit(self.copy_file, body)
+            self.send_file(body, body.fp.tell() if body.offset is None else body.offset, body.length)
+        elif body is None:
+            self.finish()
+
+    def write(self, chunks, head=tob('')):
+        if self.closed:
+            return
+        if self.discard:
+            chunks = []
+        size = sum(map(len, chunks))
+        self.sent += size
+        if self.chunked and size:
+            chunks = [tob('%x\r\n' % size)] + chunks + [tob('\r\n')]
+        self.transport.write(head + tob('').join(chunks))
+
+    def end(self):
+        if self.chunked and not self.closed:
+            self.transport.write(tob('0\r\n\r\n'))
+        self.finish()
+
+    def abort(self):
+        self.keep = False
+        if not self.closed:
+            self.transport.abort()
+        self.finish()
+
+    def copy_file(self, wrapper):
+        # Without loop.sendfile(); runs like any other streamed response.
+        try:
+            for chunk in wrapper:
+                if not self.writable.is_set():
+                    self.writable.wait()
+                if self.closed:
+                    break
+                self.loop.call_soon_threadsafe(self.write, [chunk])
+            self.loop.call_soon_threadsafe(self.end)
+        finally:
+            wrapper.close()
+
+    def send_file(self, wrapper, offset, left, task=None):
+        """ Send `left` bytes (None: up to EOF) of a file with
+            ``loop.sendfile()``, in slices of `max_buffer` bytes that each
+            have to go out within `timeout` seconds. That bypasses
+            :meth:`pause_writing`, so this is what stops a stalled client
+            from holding the file open forever. Called again for every
+            finished slice (event loop). """
+        import asyncio
+        if task is not None:
+            if task.cancelled() or task.exception() is not None:
+                self.keep = False
+                if not self.closed:
+                    self.transport.abort()
+                return self.finish(wrapper)
+            sent = task.result()
+            self.sent += sent
+            offset += sent
+            if left is not None:
+                left -= sent
+            if not sent or left == 0 or self.closed:
+                return self.finish(wrapper)
+        size = self.server.max_buffer if left is None else min(left, self.server.max_buffer)
+        task = self.loop.create_task(asyncio.wait_for(
+            self.loop.sendfile(self.transport, wrapper.fp, offset, size), self.server.timeout))
+        task.add_done_callback(functools.partial(self.send_file, wrapper, offset, left))
+
+    def finish(self, wrapper=None):
+        if wrapper is not None and hasattr(wrapper, 'close'):
+            wrapper.close()
+        if not self.server.quiet and self.headers_sent:
+            _stderr('%s - - [%s] "%s" %s %d' % (self.peer, time.strftime('%d/%b/%Y %H:%M:%S'),
+                    self.environ['bottle.raw_request_line'], self.status[:3], self.sent))
+        self.busy = self.headers_sent = False
+        self.environ = self.input = None
+        if self.closed:
+            return
+        if not self.keep:
+            if self.body_left and self.transport.can_write_eof():
+                # Closing with unread data resets the connection, which may
+                # destroy the response before the client has read it. Send
+                # EOF instead and drop what still arrives for a moment.
+                self.lingering = True
+                self.transport.write_eof()
+                self.transport.resume_reading()
+                self.deadline = None
+                self.set_timeout(min(self.server.timeout, self.linger))
+                return
+            self.transport.close()
+            return
+        # The unread rest of a small request body is discarded as it arrives;
+        # start() marked connections that left a large one for closing.
+        self.set_timeout(self.server.timeout if self.body_left else self.server.keepalive)
+        self.transport.resume_reading()
+        if self.buffer:
+            self.loop.call_soon(self.parse)
+
+
+class AsyncioServer(AsyncioServerAdapter):
+    """ HTTP/1.1 server on the standard library's asyncio (Python 3.7+).
+
+        Connections, keep-alive and pipelining are handled by a single event
+        loop; the application runs on a bounded thread pool. Request bodies
+        up to `max_buffer` bytes are read before the application is called
+        (larger and chunked ones are streamed to it), and up to `max_buffer`
+        bytes of response are buffered for the client. Idle keep-alive
+        connections and slow clients therefore cost a socket, not a worker
+        thread. :func:`static_file` responses go out via ``loop.sendfile()``.
+
+        Options:
+
+        * `workers`: Size of the thread pool. (default: 16)
+        * `backlog`: Listen backlog. (default: 1024)
+        * `keepalive`: Seconds an idle keep-alive connection is kept open.
+          (default: 15)
+        * `timeout`: Seconds a client may stall while sending a request or
+          receiving a response. (default: 30)
+        * `max_header`: Maximum size of the request line plus headers.
+          (default: 64 KiB)
+        * `max_buffer`: Maximum request body size that is buffered, and the
+          read-ahead for streamed bodies. (default: 1 MiB)
+        * `sock`: A listening socket to serve on instead of binding `host`
+          and `port` (used by :class:`PreforkServer`).
+    """
+
+    _date = (0, '')
+
+    def get_event_loop(self):
+        import asyncio
+        return asyncio.new_event_loop()
+
+    def http_date(self):
+        now = int(time.time())
+        if now != self._date[0]:
+            self._date = (now, email.utils.formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def run(self, handler):  # pragma: no cover
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        options = self.options
+        self.keepalive = float(options.get('keepalive', 15))
+        self.timeout = float(options.get('timeout', 30))
+        self.max_header = int(options.get('max_header', 64 * 1024))
+        self.max_buffer = int(options.get('max_buffer', 1024 * 1024))
+
+        self.loop = loop = self.get_event_loop()
+        asyncio.set_event_loop(loop)
+        pool = ThreadPoolExecutor(int(options.get('workers', 16)), 'bottle-worker')
+        factory = lambda: _AsyncioConnection(self, handler, loop, pool)
+        backlog = int(options.get('backlog', 1024))
+        if options.get('sock') is not None:  # Serve on an already listening socket.
+            listen = loop.create_server(factory, sock=options['sock'], backlog=backlog)
+        else:
+            listen = loop.create_server(factory, self.host, self.port, backlog=backlog,
+                                        reuse_address=True)
+        server = loop.run_until_complete(listen)
+        self.port = server.sockets[0].getsockname()[1]
+        self.base_environ = {
+            'SERVER_NAME': self.host, 'SERVER_PORT': str(self.port),
+            'SCRIPT_NAME': '', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr, 'wsgi.multithread': True,
+            'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            'wsgi.file_wrapper': WSGIFileWrapper}
+
+        def tick():  # A blocked select() would delay Ctrl-C and the reloader.
+            loop.call_later(0.5, tick)
+        tick()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            pool.shutdown(wait=False)
+            loop.close()
+
+
+class PreforkServer(ServerAdapter):
+    """ Pre-forking multi-process server (POSIX only, no dependencies).
+
+        The master process binds the listening socket once and forks
+        `workers` processes (default: one per usable CPU) that each run
+        another adapter, `backend` (default: 'wsgiref'), on that socket.
+        Workers that exit are restarted; one that keeps dying right after
+        start is restarted with a growing delay. On Ctrl-C or SIGTERM the
+        master asks all workers to stop and kills those still running
+        after `stop_timeout` seconds (default: 10).
+
+        With `reuse_port=True` (Linux, BSD) each worker listens on its own
+        SO_REUSEPORT socket instead, so the kernel spreads connections
+        evenly rather than waking all workers for every ``accept()``.
+
+        The application is loaded before the fork and shared copy-on-write,
+        but whatever state it builds up later (caches, counters) is per
+        worker. Other options are passed to the worker adapter, which must
+        accept a listening socket as `sock` (:class:`WSGIRefServer` and
+        :class:`AsyncioServer` do).
+    """
+
+    def listen(self, port, reuse_port=False, backlog=None):
+        import socket
+        family, _, _, _, address = socket.getaddrinfo(
+            self.host or None, port, 0, socket.SOCK_STREAM, 0, socket.AI_PASSIVE)[0]
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(address)
+        if backlog is not None:
+            sock.listen(backlog)
+        return sock
+
+    def spawn(self, server, handler, options, reuse_port, backlog):
+        import signal
+        # A signal between fork() and the try below would unwind the child
+        # through the master's code, so both are blocked until then.
+        stop = (signal.SIGINT, signal.SIGTERM)
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop)
+        try:
+            pid = os.fork()
+        except OSError:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop)
+            raise
+        if pid:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop)
+            return pid
+        status = 0
+        try:
+            for signum in stop:
+                signal.signal(signum, _prefork_stop)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop)
+            sock = self.socket
+            if reuse_port:
+                sock = self.listen(self.port, True, backlog)
+                self.socket.close()
+            worker = server(self.host, self.port, sock=sock, **options)
+            worker.quiet = self.quiet
+            worker.run(handler)
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            print_exc()
+            status = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+            os._exit(status)
+
+    def reap(self, children):
+        """ Remove exited workers from `children` and return their
+            ``(pid, started, status)``. """
+        exited = []
+        # Wait for each worker by pid: waitpid(-1) would also reap processes
+        # the application itself spawned before forking.
+        for pid in list(children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except OSError:  # Already reaped by someone else (ECHILD).
+                done, status = pid, 0
+            if done:
+                exited.append((pid, children.pop(pid), status))
+        return exited
+
+    def run(self, handler):  # pragma: no cover
+        import signal, socket
+        if not hasattr(os, 'fork'):
+            raise RuntimeError('PreforkServer requires os.fork() (POSIX only).')
+        options = dict(self.options)
+        workers = int(options.pop('workers', 0))
+        if not workers:
+            workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') \
+                      else getattr(os, 'cpu_count', lambda: 1)() or 1
+        server = options.pop('backend', 'wsgiref')
+        if isinstance(server, basestring):
+            server = server_names.get(server) or load(server)
+        reuse_port = bool(options.pop('reuse_port', False))
+        if reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+            raise RuntimeError('SO_REUSEPORT is not supported on this platform.')
+        backlog = int(options.pop('backlog', 1024))
+        stop_timeout = float(options.pop('stop_timeout', 10))
+
+        # In reuse_port mode this socket only reserves the port and is never
+        # listened on; otherwise all workers accept() on it.
+        self.socket = self.listen(self.port, reuse_port, None if reuse_port else backlog)
+        self.port = self.socket.getsockname()[1]
+        try:
+            previous = signal.signal(signal.SIGTERM, _prefork_stop)
+        except ValueError:  # Not the main thread.
+            previous = None
+
+        children, delay = {}, 0
+        try:
+            while True:
+                exited = self.reap(children)
+                for pid, started, status in exited:
+                    if not self.quiet:
+                        reason = 'signal %d' % os.WTERMSIG(status) if os.WIFSIGNALED(status) \
+                                 else 'status %d' % os.WEXITSTATUS(status)
+                        _stderr('Worker %d exited (%s), restarting.' % (pid, reason))
+                if exited:
+                    now = time.time()
+                    if any(now - started < 1 for _, started, _ in exited):
+                        delay = min(max(delay * 2, 0.5), 30)  # Crash loop: back off.
+                    else:
+                        delay = 0
+                if delay and len(children) < workers:
+                    time.sleep(delay)
+                while len(children) < workers:
+                    children[self.spawn(server, handler, options, reuse_port, backlog)] = time.time()
+                time.sleep(0.5)
+        finally:
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+            deadline = time.time() + stop_timeout
+            while children and time.time() < deadline:
+                self.reap(children)
+                time.sleep(0.05)
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                except OSError:
+                    pass
+            self.socket.close()
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+
+
+def _prefork_stop(signum, frame):
+    import signal
+    signal.signal(signum, signal.SIG_IGN)  # Once; don't interrupt the cleanup.
+    raise KeyboardInterrupt()
+
+
 class AutoServer(ServerAdapter):
     """ Untested. """
     adapters = [WaitressServer, PasteServer, TwistedServer, CherryPyServer,
@@ -3820,6 +5488,7 @@ server_names = {
     'cgi': CGIServer,
     'flup': FlupFCGIServer,
     'wsgiref': WSGIRefServer,
+    'wsgiref-threaded': ThreadedWSGIRefServer,
     'waitress': WaitressServer,
     'cherrypy': CherryPyServer,
     'cheroot': CherootServer,
@@ -3834,6 +5503,8 @@ server_names = {
     'eventlet': EventletServer,
     'gevent': GeventServer,
     'bjoern': BjoernServer,
+    'asyncio': AsyncioServer,
+    'prefork': PreforkServer,
     'aiohttp': AiohttpServer,
     'uvloop': AiohttpUVLoopServer,
     'auto': AutoServer,
@@ -3904,7 +5575,9 @@ def run(app=None,
         :param port: Server port to bind to. Values below 1024 require root
                privileges. (default: 8080)
         :param reloader: Start auto-reloading server? (default: False)
-        :param interval: Auto-reloader interval in seconds (default: 1)
+        :param interval: Auto-reloader interval in seconds (default: 1). On
+               Linux, changed files are detected immediately via inotify and
+               this only controls how often the parent process is checked.
         :param quiet: Suppress output to stdout and stderr? (default: False)
         :param options: Options passed to the server adapter.
      """
@@ -3976,7 +5649,10 @@ def run(app=None,
 
         if reloader:
             lockfile = os.environ.get('BOTTLE_LOCKFILE')
-            bgcheck = FileCheckerThread(lockfile, interval)
+            if InotifyCheckerThread.available():
+                bgcheck = InotifyCheckerThread(lockfile, interval)
+            else:
+                bgcheck = FileCheckerThread(lockfile, interval)
             with bgcheck:
                 server.run(app)
             if bgcheck.status == 'reload':
@@ -4036,6 +5712,100 @@ class FileCheckerThread(threading.Thread):
         self.join()
         return exc_type is not None and issubclass(exc_type, KeyboardInterrupt)
 
+
+class InotifyCheckerThread(FileCheckerThread):
+    """ A :class:`FileCheckerThread` that waits for inotify events (Linux)
+        instead of polling every module file. Changes are noticed within
+        milliseconds; while idle, only the lockfile is checked once per
+        `interval`. Falls back to polling if inotify cannot be set up. """
+
+    IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x4, 0x8, 0x40, 0x80
+    IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF = 0x200, 0x400, 0x800
+    IN_Q_OVERFLOW, IN_CLOEXEC = 0x4000, 0x80000
+    #: Events on a module's directory that mean the module file changed.
+    file_mask = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+    #: Events on a watched path itself that mean it is gone.
+    self_mask = IN_DELETE_SELF | IN_MOVE_SELF
+
+    _libc = None
+
+    @classmethod
+    def available(cls):
+        """ True if inotify can be used on this system. """
+        if cls._libc is None:
+            cls._libc = False
+            if sys.platform.startswith('linux'):
+                try:
+                    import ctypes
+                    libc = ctypes.CDLL(None, use_errno=True)
+                    if hasattr(libc, 'inotify_init1'):
+                        cls._libc = libc
+                except (ImportError, OSError):
+                    pass
+        return bool(cls._libc)
+
+    def __init__(self, lockfile, interval):
+        FileCheckerThread.__init__(self, lockfile, interval)
+        self._wakeup = os.pipe()
+
+    def _watch(self, fd, path, mask):
+        encode = getattr(os, 'fsencode', tob)
+        wd = self._libc.inotify_add_watch(fd, encode(path), mask)
+        if wd < 0:
+            raise OSError('inotify_add_watch failed for %s' % path)
+        return wd
+
+    def run(self):
+        import select, struct
+        wakeup = self._wakeup[0]
+        fd = self._libc.inotify_init1(self.IN_CLOEXEC) if self.available() else -1
+        try:
+            if fd < 0:
+                return FileCheckerThread.run(self)
+            files = {}
+            for module in list(sys.modules.values()):
+                path = getattr(module, '__file__', '') or ''
+                if path[-4:] in ('.pyo', '.pyc'): path = path[:-1]
+                if path and os.path.exists(path):
+                    folder, name = os.path.split(os.path.abspath(path))
+                    files.setdefault(folder, set()).add(tob(name))
+            try:
+                watches = dict((self._watch(fd, folder, self.file_mask | self.self_mask), names)
+                               for folder, names in files.items())
+                lock_wd = self._watch(fd, self.lockfile, self.self_mask)
+            except OSError:  # Probably out of watches (fs.inotify.max_user_watches)
+                return FileCheckerThread.run(self)
+            header = struct.Struct('iIII')
+            while not self.status:
+                ready = select.select([fd, wakeup], [], [], self.interval)[0]
+                if self.status:
+                    break
+                if not os.path.exists(self.lockfile) \
+                or os.stat(self.lockfile).st_mtime < time.time() - self.interval - 5:
+                    self.status = 'error'
+                elif fd in ready:
+                    data, pos = os.read(fd, 64 * 1024), 0
+                    while pos < len(data) and not self.status:
+                        wd, mask, _, size = header.unpack_from(data, pos)
+                        name = data[pos + header.size:pos + header.size + size].rstrip(b'\0')
+                        pos += header.size + size
+                        if wd == lock_wd:
+                            self.status = 'error'
+                        elif mask & (self.IN_Q_OVERFLOW | self.self_mask) \
+                        or name in watches.get(wd, ()):
+                            self.status = 'reload'
+                if self.status in ('error', 'reload'):
+                    thread.interrupt_main()
+        finally:
+            if fd >= 0: os.close(fd)
+
+    def __exit__(self, exc_type, *_):
+        if not self.status: self.status = 'exit'  # silent exit
+        os.write(self._wakeup[1], b'x')
+        self.join()
+        for pipe_fd in self._wakeup: os.close(pipe_fd)
+        return exc_type is not None and issubclass(exc_type, KeyboardInterrupt)
+
 ###############################################################################
 # Template Adapters ############################################################
 ###############################################################################
@@ -4045,6 +5815,90 @@ class TemplateError(BottleException):
     pass
 
 
+def _template_size(tpl):
+    """ Approximate size of a template: the length of its source. """
+    source = getattr(tpl, 'source', None)
+    if source:
+        return len(source)
+    filename = getattr(tpl, 'filename', None)
+    try:
+        return os.path.getsize(filename) if filename else 0
+    except OSError:
+        return 0
+
+
+class TemplateCache(DictMixin):
+    """ A thread-safe, bounded LRU mapping for template objects, used for
+        :data:`TEMPLATES` and the include cache of :class:`SimpleTemplate`.
+        When either limit is exceeded, the least recently used entries are
+        dropped (and simply rebuilt when needed again).
+
+        Lookups through ``cache[key]`` and :meth:`get` are counted in
+        :attr:`hits` and :attr:`misses`; :meth:`stats` returns a summary.
+
+        :param maxsize: Maximum number of entries.
+        :param maxbytes: Maximum combined size of all entries, as measured by
+            `sizeof` (by default the length of the template source).
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=64 * 1024 * 1024,
+                 sizeof=_template_size):
+        self.maxsize, self.maxbytes, self.sizeof = maxsize, maxbytes, sizeof
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            try:
+                entry = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                raise
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > 1 and (len(self._entries) > self.maxsize
+                                              or self._bytes > self.maxbytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._bytes -= self._entries.pop(key)[1]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """ Return a dict with hit, miss and eviction counts and the current
+            number and combined size of entries. """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': len(self._entries),
+                'bytes': self._bytes}
+
+
 class BaseTemplate(object):
     """ Base class and minimal API for template adapters """
     extensions = ['tpl', 'html', 'thtml', 'stpl']
@@ -4126,6 +5980,13 @@ class BaseTemplate(object):
         """
         raise NotImplementedError
 
+    def stream(self, *args, **kwargs):
+        """ Render the template and return an iterator over the output.
+        Adapters that can produce output incrementally override this; the
+        default yields the result of :meth:`render` as a single chunk.
+        """
+        return iter([self.render(*args, **kwargs)])
+
 
 class MakoTemplate(BaseTemplate):
     def prepare(self, **options):
@@ -4199,29 +6060,107 @@ class Jinja2Template(BaseTemplate):
             return (f.read().decode(self.encoding), fname, lambda: False)
 
 
+class TemplateBytecodeCache(object):
+    """ Persistent cache for translated and compiled :class:`SimpleTemplate`
+        code. Entries are marshal files in `directory`, keyed by a hash of the
+        template source, syntax and filename plus the bottle and Python
+        versions, so a restarted process can skip parsing and compiling.
+        Stale entries are never read, but are only removed by :meth:`clear`.
+
+        Enable it for all templates with::
+
+            SimpleTemplate.global_config('bytecode_cache',
+                                         TemplateBytecodeCache('./.tplcache'))
+    """
+
+    suffix = '.stplc'
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def key(self, source, filename=None, syntax=None):
+        h = hashlib.sha1(tob(__version__ + '\0' + sys.version + '\0'))
+        h.update(tob('%r\0%r\0' % (filename, syntax)))
+        h.update(tob(source))
+        return h.hexdigest()
+
+    def load(self, key):
+        """ Return the cached ``(code, encoding, co)`` tuple or None. """
+        try:
+            with open(os.path.join(self.directory, key + self.suffix), 'rb') as fp:
+                return marshal.load(fp)
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, key, value):
+        """ Write an entry atomically. Errors are ignored, the cache is just
+            an optimization. """
+        tmp = None
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(fd, 'wb') as fp:
+                marshal.dump(value, fp)
+            getattr(os, 'replace', os.rename)(tmp, os.path.join(self.directory, key + self.suffix))
+        except (IOError, OSError, ValueError):
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """ Remove all entries. """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(self.suffix):
+                    os.remove(os.path.join(self.directory, name))
+
+
 class SimpleTemplate(BaseTemplate):
+    #: Minimum size of the chunks produced by :meth:`stream`.
+    stream_chunk = 8192
+
     def prepare(self,
                 escape_func=html_escape,
                 noescape=False,
-                syntax=None, **ka):
-        self.cache = {}
+                syntax=None,
+                bytecode_cache=None, **ka):
+        self.cache = TemplateCache(maxsize=64)
         enc = self.encoding
         self._str = lambda x: touni(x, enc)
         self._escape = lambda x: escape_func(touni(x, enc))
         self.syntax = syntax
+        self.bytecode_cache = bytecode_cache
         if noescape:
             self._str, self._escape = self._escape, self._str
 
     @cached_property
     def co(self):
-        return compile(self.code, self.filename or '<string>', 'exec')
+        cache = self.bytecode_cache
+        if cache is None:
+            return compile(self.code, self.filename or '<string>', 'exec')
+        key = cache.key(self._source, self.filename, self.syntax)
+        hit = cache.load(key)
+        if hit:
+            code, self.encoding, co = hit
+            self.__dict__['code'] = code
+            return co
+        co = compile(self.code, self.filename or '<string>', 'exec')
+        cache.store(key, (self.code, self.encoding, co))
+        return co
+
+    @cached_property
+    def _source(self):
+        if self.source:
+            return self.source
+        with open(self.filename, 'rb') as f:
+            return f.read()
 
     @cached_property
     def code(self):
-        source = self.source
-        if not source:
-            with open(self.filename, 'rb') as f:
-                source = f.read()
+        source = self._source
         try:
             source, encoding = touni(source), 'utf8'
         except UnicodeError:
@@ -4231,15 +6170,112 @@ class SimpleTemplate(BaseTemplate):
         self.encoding = parser.encoding
         return code
 
+    @cached_property
+    def _stream_co(self):
+        """ The template code rewritten into a generator function
+            ``_stpl_stream()`` that yields after every output statement, for
+            :meth:`stream`. Statement-level ``include()`` calls are turned
+            into loops over the included template's stream, and all names
+            assigned at the top level are declared global, so the template
+            sees the same namespace as with :meth:`execute`. """
+        import ast
+        filename = self.filename or '<string>'
+
+        def rewrite(stmts):
+            out = []
+            for node in stmts:
+                if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call) \
+                   and isinstance(node.value.func, ast.Name):
+                    name = node.value.func.id
+                    if name == 'include':
+                        node.value.func.id = '_include_stream'
+                        loop = ast.parse('for _stpl_chunk in _:\n yield _stpl_chunk').body[0]
+                        loop.iter = node.value
+                        out.append(ast.copy_location(loop, node))
+                        continue
+                    if name == '_printlist':
+                        out.append(node)
+                        out.append(ast.copy_location(ast.Expr(ast.Yield(None)), node))
+                        continue
+                if not isinstance(node, (ast.FunctionDef, ast.ClassDef)) \
+                   and type(node).__name__ != 'AsyncFunctionDef':
+                    for child in [node] + getattr(node, 'handlers', []) + getattr(node, 'cases', []):
+                        for field in ('body', 'orelse', 'finalbody'):
+                            value = getattr(child, field, None)
+                            if isinstance(value, list) and value and isinstance(value[0], ast.stmt):
+                                setattr(child, field, rewrite(value))
+                out.append(node)
+            return out
+
+        module = ast.parse('def _stpl_stream():\n yield\n', filename)
+        func = module.body[0]
+        func.body = rewrite(ast.parse(self.code, filename).body) + func.body
+        ast.fix_missing_locations(module)
+        inner = [c for c in compile(module, filename, 'exec').co_consts
+                 if getattr(c, 'co_name', None) == '_stpl_stream'][0]
+        names = sorted(set(inner.co_varnames) | set(inner.co_cellvars))
+        if names:
+            func.body.insert(0, ast.copy_location(ast.Global(names=names), func))
+        return compile(module, filename, 'exec')
+
     def _rebase(self, _env, _name=None, **kwargs):
         _env['_rebase'] = (_name, kwargs)
 
     def _include(self, _env, _name=None, **kwargs):
         env = _env.copy()
         env.update(kwargs)
-        if _name not in self.cache:
-            self.cache[_name] = self.__class__(name=_name, lookup=self.lookup, syntax=self.syntax)
-        return self.cache[_name].execute(env['_stdout'], env)
+        tpl = self.cache.get(_name)
+        if tpl is None:
+            tpl = self.cache[_name] = self.__class__(name=_name, lookup=self.lookup, syntax=self.syntax,
+                                                     bytecode_cache=self.bytecode_cache)
+        return tpl.execute(env['_stdout'], env)
+
+    def _rebase_stream(self, _env, _name=None, **kwargs):
+        state = _env['_stream']
+        if state['flushed']:
+            raise TemplateError('rebase() called after output was already streamed.')
+        if not _env.get('_rebase'):
+            state['pending'] += 1
+        _env['_rebase'] = (_name, kwargs)
+
+    def _include_stream(self, _env, _name=None, **kwargs):
+        env = _env.copy()
+        env.update(kwargs)
+        tpl = self.cache.get(_name)
+        if tpl is None:
+            tpl = self.cache[_name] = self.__class__(name=_name, lookup=self.lookup, syntax=self.syntax,
+                                                     bytecode_cache=self.bytecode_cache)
+        return tpl.execute_stream(env['_stdout'], env)
+
+    def execute_stream(self, _stdout, kwargs):
+        """ Like :meth:`execute`, but a generator that pauses (yields None)
+            each time output was appended to `_stdout`. """
+        env = self.defaults.copy()
+        env.update(kwargs)
+        env.update({
+            '_stdout': _stdout,
+            '_printlist': _stdout.extend,
+            'include': functools.partial(self._include, env),
+            '_include_stream': functools.partial(self._include_stream, env),
+            'rebase': functools.partial(self._rebase_stream, env),
+            '_rebase': None,
+            '_stream': kwargs.get('_stream') or {'pending': 0, 'flushed': False},
+            '_str': self._str,
+            '_escape': self._escape,
+            'get': env.get,
+            'setdefault': env.setdefault,
+            'defined': env.__contains__
+        })
+        exec(self._stream_co, env)
+        for _ in env['_stpl_stream']():
+            yield
+        if env.get('_rebase'):
+            subtpl, rargs = env.pop('_rebase')
+            rargs['base'] = ''.join(_stdout)  #copy stdout
+            del _stdout[:]  # clear stdout
+            env['_stream']['pending'] -= 1
+            for _ in self._include_stream(env, subtpl, **rargs):
+                yield
 
     def execute(self, _stdout, kwargs):
         env = self.defaults.copy()
@@ -4274,6 +6310,37 @@ class SimpleTemplate(BaseTemplate):
         self.execute(stdout, env)
         return ''.join(stdout)
 
+    def stream(self, *args, **kwargs):
+        """ Render the template like :meth:`render`, but return an iterator
+            that yields the output in chunks of about :attr:`stream_chunk`
+            characters while the template is still running, including
+            output of ``include()`` statements. Output of a template that
+            calls ``rebase()`` is collected first, because it becomes the
+            ``base`` variable of the base template; such templates must call
+            ``rebase()`` before the first chunk is sent. """
+        env = {}
+        stdout = []
+        for dictarg in args:
+            env.update(dictarg)
+        env.update(kwargs)
+        state = env['_stream'] = {'pending': 0, 'flushed': False}
+        size = counted = 0
+        for _ in self.execute_stream(stdout, env):
+            if state['pending']:
+                continue
+            if counted > len(stdout):  # Cleared by a rebase
+                size = counted = 0
+            size += sum(map(len, stdout[counted:]))
+            counted = len(stdout)
+            if size >= self.stream_chunk:
+                state['flushed'] = True
+                chunk = ''.join(stdout)
+                del stdout[:]
+                size = counted = 0
+                yield chunk
+        if stdout:
+            yield ''.join(stdout)
+
 
 class StplSyntaxError(TemplateError):
     pass
@@ -4475,26 +6542,33 @@ def template(*args, **kwargs):
     Get a rendered template as a string iterator.
     You can use a name, a filename or a template string as first parameter.
     Template rendering arguments can be passed as dictionaries
-    or directly (as keyword arguments).
+    or directly (as keyword arguments). With ``template_stream=True``, an
+    iterator that yields the output in chunks is returned instead (see
+    :meth:`SimpleTemplate.stream`).
     """
     tpl = args[0] if args else None
     for dictarg in args[1:]:
         kwargs.update(dictarg)
+    stream = kwargs.pop('template_stream', False)
     adapter = kwargs.pop('template_adapter', SimpleTemplate)
     lookup = kwargs.pop('template_lookup', TEMPLATE_PATH)
     tplid = (id(lookup), tpl)
-    if tplid not in TEMPLATES or DEBUG:
+    obj = None if DEBUG else TEMPLATES.get(tplid)
+    if obj is None:
         settings = kwargs.pop('template_settings', {})
         if isinstance(tpl, adapter):
-            TEMPLATES[tplid] = tpl
-            if settings: TEMPLATES[tplid].prepare(**settings)
+            obj = tpl
+            if settings: obj.prepare(**settings)
         elif "\n" in tpl or "{" in tpl or "%" in tpl or '$' in tpl:
-            TEMPLATES[tplid] = adapter(source=tpl, lookup=lookup, **settings)
+            obj = adapter(source=tpl, lookup=lookup, **settings)
         else:
-            TEMPLATES[tplid] = adapter(name=tpl, lookup=lookup, **settings)
-    if not TEMPLATES[tplid]:
+            obj = adapter(name=tpl, lookup=lookup, **settings)
+        TEMPLATES[tplid] = obj
+    if not obj:
         abort(500, 'Template (%s) not found' % tpl)
-    return TEMPLATES[tplid].render(kwargs)
+    if stream:
+        return obj.stream(kwargs)
+    return obj.render(kwargs)
 
 
 mako_template = functools.partial(template, template_adapter=MakoTemplate)
@@ -4541,7 +6615,8 @@ jinja2_view = functools.partial(view, template_adapter=Jinja2Template)
 ###############################################################################
 
 TEMPLATE_PATH = ['./', './views/']
-TEMPLATES = {}
+#: Compiled templates used by :func:`template`, see :class:`TemplateCache`.
+TEMPLATES = TemplateCache()
 DEBUG = False
 NORUN = False  # If set, run() does nothing. Used by load_app()
 
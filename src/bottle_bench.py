@@ -0,0 +1,295 @@
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import bottle
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bottle_bench_baseline.json")
+# Requests/sec depends on the machine and its load, so it gets a wide margin
+# and only fails the run with --strict; allocations are deterministic for a
+# given Python version and always do. Re-run with --save on your own machine
+# before comparing a change, the stored req/s numbers are from another one.
+RPS_TOLERANCE = 0.25
+ALLOC_TOLERANCE = 0.10
+
+# Cases whose numbers depend on the JSON encoder bottle picked up; they are
+# only compared against a baseline recorded with the same one.
+JSON_CASES = ("json",)
+
+STATIC_SIZE = 64 << 10
+UPLOAD_SIZE = 16 << 10
+BOUNDARY = "----benchboundary7MA4YWxkTrZu0gW"
+
+TEMPLATE = """<table>
+% for row in rows:
+<tr><td>{{row["name"]}}</td><td>{{row["engine"]}}</td><td>{{!row["link"]}}</td></tr>
+% end
+</table>
+"""
+
+def json_backend():
+    if bottle.orjson_dumps is not None:
+        return "orjson"
+    return bottle.json_dumps.__module__
+
+def build_app(static_root):
+    app = bottle.Bottle()
+    app.config["json.fast"] = True  # Measure orjson when it is installed.
+    rows = [{"name": f"preset {i}", "engine": "gzdoom", "link": f"<a href='/p/{i}'>open</a>"} for i in range(20)]
+    page = {"total": 500, "offset": 0, "limit": 50, "items": [
+        {"path": f"megawads/set{i}.json", "name": f"Set {i}", "engine": "C:/games/gzdoom.exe",
+         "iwad": "doom2.wad", "files": ["a.pk3", "b.wad"]} for i in range(50)]}
+
+    @app.route("/static")
+    def static():
+        return "ok"
+
+    @app.route("/user/<name>/<uid:int>")
+    def dynamic(name, uid):
+        return f"{name} {uid}"
+
+    @app.route("/query")
+    def query():
+        q = bottle.request.query
+        h = bottle.request.headers
+        return f"{q.get('engine')} {q.get('offset')} {q.getunicode('name')} {h.get('Accept')} {h.get('X-Request-Id')}"
+
+    @app.route("/json")
+    def as_json():
+        return page
+
+    @app.route("/template")
+    def template():
+        return bottle.template(TEMPLATE, rows=rows)
+
+    @app.route("/file/<name>")
+    def static_file(name):
+        return bottle.static_file(name, root=static_root)
+
+    @app.route("/upload", method="POST")
+    def upload():
+        files = bottle.request.files
+        forms = bottle.request.forms
+        return f"{forms.get('title')} {files.get('data').filename} {len(files.get('data').file.read())}"
+
+    return app
+
+def multipart_body():
+    data = bytes(range(256)) * (UPLOAD_SIZE // 256)
+    parts = []
+    for name, value in (("title", "My map pack"), ("engine", "gzdoom")):
+        parts.append(f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode())
+    parts.append(f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"data\"; filename=\"maps.wad\"\r\n"
+                 "Content-Type: application/octet-stream\r\n\r\n".encode() + data + b"\r\n")
+    parts.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(parts)
+
+def environ(path, method="GET", query="", body=b"", **extra):
+    env = {
+        "REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": "127.0.0.1", "SERVER_PORT": "8090", "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1", "wsgi.url_scheme": "http", "wsgi.version": (1, 0),
+        "wsgi.errors": sys.stderr, "wsgi.multithread": False, "wsgi.multiprocess": False,
+        "wsgi.run_once": False, "wsgi.file_wrapper": bottle.WSGIFileWrapper, "HTTP_HOST": "127.0.0.1:8090", "HTTP_USER_AGENT": "bottle-bench/1.0",
+        "HTTP_ACCEPT": "*/*", "HTTP_ACCEPT_ENCODING": "gzip, deflate", "HTTP_CONNECTION": "keep-alive"
+    }
+    if body:
+        env["CONTENT_LENGTH"] = str(len(body))
+    env.update(extra)
+    return env
+
+# name -> (expected status, environ keyword arguments)
+CASES = {
+    "static": (200, {"path": "/static"}),
+    "dynamic": (200, {"path": "/user/doomguy/42"}),
+    "not_found": (404, {"path": "/missing/page"}),
+    "method_not_allowed": (405, {"path": "/static", "method": "DELETE"}),
+    "query_headers": (200, {
+        "path": "/query",
+        "query": "engine=C%3A%2Fgames%2Fgzdoom.exe&iwad=doom2.wad&offset=100&limit=50&sort=name"
+                 "&order=asc&name=caf%C3%A9&tag=a&tag=b&tag=c",
+        "HTTP_X_REQUEST_ID": "5f0c2a", "HTTP_AUTHORIZATION": "Bearer 0123456789abcdef",
+        "HTTP_ACCEPT": "application/json", "HTTP_ACCEPT_LANGUAGE": "en-US,en;q=0.9"
+    }),
+    "json": (200, {"path": "/json"}),
+    "template": (200, {"path": "/template"}),
+    "static_file": (200, {"path": "/file/data.bin"}),
+    "static_file_range": (206, {"path": "/file/data.bin", "HTTP_RANGE": "bytes=1024-9215"}),
+    "multipart_upload": (200, {
+        "path": "/upload", "method": "POST", "body": multipart_body(),
+        "CONTENT_TYPE": f"multipart/form-data; boundary={BOUNDARY}"
+    })
+}
+
+class Bench:
+    # Drives Bottle.wsgi the way a WSGI server would: a fresh environ per
+    # request, the body iterated to the end and close() called on it. File
+    # wrappers go through os.sendfile() like they do in the bundled servers.
+    def __init__(self, app):
+        self.app = app
+        self.status = None
+        self.sink = os.open(os.devnull, os.O_WRONLY) if hasattr(os, "sendfile") else None
+
+    def close(self):
+        if self.sink is not None:
+            os.close(self.sink)
+            self.sink = None
+
+    def start_response(self, status, headers, exc_info=None):
+        self.status = status
+
+    def make_environ(self, spec):
+        spec = dict(spec)
+        body = spec.pop("body", b"")
+        env = environ(body=body, **spec)
+        env["wsgi.input"] = io.BytesIO(body)
+        return env
+
+    def call(self, env):
+        out = self.app(env, self.start_response)
+        try:
+            if isinstance(out, bottle.WSGIFileWrapper) and self.sink is not None:
+                self.sendfile(out)
+            else:
+                for _ in out:
+                    pass
+        finally:
+            if hasattr(out, "close"):
+                out.close()
+
+    def sendfile(self, wrapper):
+        fd = wrapper.fileno()
+        offset = wrapper.fp.tell() if wrapper.offset is None else wrapper.offset
+        left = os.fstat(fd).st_size - offset if wrapper.length is None else wrapper.length
+        while left > 0:
+            sent = os.sendfile(self.sink, fd, offset, left)
+            if not sent:
+                break
+            offset += sent
+            left -= sent
+
+    def check(self, name, expected, spec):
+        self.call(self.make_environ(spec))
+        code = int(self.status.split()[0])
+        if code != expected:
+            raise RuntimeError(f"{name}: expected {expected}, got {self.status}")
+
+    def rps(self, spec, requests, repeat):
+        best = 0.0
+        for _ in range(repeat):
+            # Environ construction is not part of what is measured.
+            envs = [self.make_environ(spec) for _ in range(requests)]
+            start = time.perf_counter()
+            for env in envs:
+                self.call(env)
+            best = max(best, requests / (time.perf_counter() - start))
+        return best
+
+    def alloc(self, spec, requests):
+        # Peak traced memory above the starting point while serving one
+        # request; the median over several requests evens out GC timing.
+        envs = [self.make_environ(spec) for _ in range(requests)]
+        peaks = []
+        tracemalloc.start()
+        try:
+            for env in envs:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                self.call(env)
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        finally:
+            tracemalloc.stop()
+        peaks.sort()
+        return peaks[len(peaks) // 2]
+
+def run(names, requests, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "data.bin"), "wb") as f:
+            f.write(os.urandom(STATIC_SIZE))
+        bench = Bench(build_app(root))
+        try:
+            for name in names:
+                expected, spec = CASES[name]
+                for _ in range(max(10, requests // 20)):
+                    bench.check(name, expected, spec)
+                results[name] = {
+                    "rps": round(bench.rps(spec, requests, repeat), 1),
+                    "alloc_bytes": bench.alloc(spec, min(requests, 200))
+                }
+                if name in JSON_CASES:
+                    results[name]["json_backend"] = json_backend()
+        finally:
+            bench.close()
+    return results
+
+def compare(results, baseline, strict=False):
+    regressions = []
+    lines = [f"{'case':<20} {'req/s':>10} {'base':>10} {'change':>8} {'alloc B':>9} {'base':>9} {'change':>8}"]
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:<20} {result['rps']:>10.0f} {'-':>10} {'':>8} {result['alloc_bytes']:>9} {'-':>9}")
+            continue
+        if base.get("json_backend", result.get("json_backend")) != result.get("json_backend"):
+            # Not comparable: reported, but never a regression.
+            lines.append(f"{name:<20} {result['rps']:>10.0f} {base['rps']:>10.0f} {'':>8} "
+                         f"{result['alloc_bytes']:>9} {base['alloc_bytes']:>9} {'':>8} "
+                         f"SKIPPED (baseline used {base['json_backend']}, this run {result['json_backend']})")
+            continue
+        rps_change = result["rps"] / base["rps"] - 1
+        alloc_change = result["alloc_bytes"] / base["alloc_bytes"] - 1 if base["alloc_bytes"] else 0.0
+        flag = ""
+        if rps_change < -RPS_TOLERANCE:
+            flag += " SLOWER"
+        if alloc_change > ALLOC_TOLERANCE:
+            flag += " MORE-ALLOC"
+        if alloc_change > ALLOC_TOLERANCE or (strict and rps_change < -RPS_TOLERANCE):
+            regressions.append(name)
+        lines.append(f"{name:<20} {result['rps']:>10.0f} {base['rps']:>10.0f} {rps_change:>+8.1%} "
+                     f"{result['alloc_bytes']:>9} {base['alloc_bytes']:>9} {alloc_change:>+8.1%}{flag}")
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-request overhead benchmarks for the vendored bottle.py.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("-n", "--requests", type=int, default=1000, help="requests per timing round")
+    parser.add_argument("-r", "--repeat", type=int, default=7, help="timing rounds; the best one is reported")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file to compare against")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--strict", action="store_true", help="also fail when req/s drops below the baseline")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    results = run(args.cases or list(CASES), args.requests, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+    lines, regressions = compare(results, baseline, args.strict)
+    print(f"bottle {bottle.__version__}, Python {sys.version.split()[0]}, JSON encoder {json_backend()}")
+    print("\n".join(lines))
+
+    if args.save:
+        # Only the cases that were run are replaced.
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "bottle": bottle.__version__, "cases": baseline},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -5,8 +5,23 @@ PATCH_INFO = {
         "Cleaner preset parsing and preview",
         "Refactored drag-and-drop logic",
         "PATCH-ready for future features",
-        "Expanded map support (.wad, .pk3, .zip)"
+        "Expanded map support (.wad, .pk3, .zip)",
+        "Remote API JSON responses no longer have spaces after \":\" and \",\""
     ]
 }
 
-PRESET_GLOB_DIR = "./presets"
\ No newline at end of file
+PRESET_GLOB_DIR = "./presets"
+
+# Remote-control HTTP API (see remote_api.py). Bind to 0.0.0.0 to allow LAN access.
+REMOTE_API = {
+    "enabled": False,
+    "host": "127.0.0.1",
+    "port": 8090,
+    # bottle server adapter; "asyncio" keeps idle dashboard connections cheap.
+    "server": "asyncio",
+    # Largest mod file accepted by PUT /api/mods/<name>, in bytes.
+    "max_upload": 4 * 1024 ** 3
+}
+
+# Mods uploaded through the remote API are stored here.
+MOD_LIBRARY_DIR = "./mods"
\ No newline at end of file
@@ -10,4 +10,20 @@ def classify_file(path):
         return "wad"
     elif ext == ".zip":
         return "map"
-    return None
\ No newline at end of file
+    return None
+
+def iter_files(root, suffix, running=lambda: True):
+    stack = [root]
+    while stack and running():
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if not running():
+                        return
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(suffix):
+                        yield entry.path
+        except PermissionError:
+            continue
\ No newline at end of file
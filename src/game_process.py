@@ -0,0 +1,50 @@
+import subprocess
+import threading
+import time
+from load_order import LoadOrder
+
+def build_command(engine, iwad="", files=()):
+    cmd = [engine]
+    if iwad:
+        cmd += ["-iwad", iwad]
+    cmd += LoadOrder(files).args()
+    return cmd
+
+class ProcessTable:
+    # Launches are started from both the GUI and the remote API thread.
+    def __init__(self):
+        self._procs = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def launch(self, engine, iwad="", files=()):
+        cmd = build_command(engine, iwad, files)
+        proc = subprocess.Popen(cmd)
+        with self._lock:
+            launch_id = self._next_id
+            self._next_id += 1
+            self._procs[launch_id] = (proc, cmd, time.time())
+        return launch_id
+
+    def status(self, launch_id):
+        with self._lock:
+            entry = self._procs.get(launch_id)
+        if entry is None:
+            return None
+        proc, cmd, started = entry
+        code = proc.poll()
+        return {
+            "id": launch_id,
+            "pid": proc.pid,
+            "command": cmd,
+            "started": started,
+            "running": code is None,
+            "returncode": code
+        }
+
+    def all_status(self):
+        with self._lock:
+            ids = sorted(self._procs)
+        return [self.status(launch_id) for launch_id in ids]
+
+PROCESSES = ProcessTable()
\ No newline at end of file
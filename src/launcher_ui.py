@@ -1,5 +1,4 @@
 import os
-import subprocess
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout,
     QHBoxLayout, QTextEdit, QDialog, QGroupBox, QListWidget,
@@ -8,26 +7,42 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 
-from config import PATCH_INFO, PRESET_GLOB_DIR
+from config import MOD_LIBRARY_DIR, PATCH_INFO, PRESET_GLOB_DIR, REMOTE_API
 from file_utils import classify_file
+from game_process import PROCESSES
+from load_order import LoadOrder
+from mod_library import ModLibrary
+from path_table import PATHS, basename
+from preset_bundle import export_presets, import_presets
 from preset_io import parse_preset, preview_presets, save_preset as io_save_preset
 from preset_scanner import PresetScanner
+from preset_store import PresetStore
+from remote_api import start_remote_api
+
+BUNDLE_FILTER = "Preset Bundles (*.jsonl.gz *.jsonl *.tar.gz *.tgz)"
 
 class PurpleLauncher(QWidget):
     def __init__(self):
         super().__init__()
         self.preset_root = os.path.abspath(PRESET_GLOB_DIR)
         self.scanner = None
+        self.presets = PresetStore()
         self.setWindowTitle(f"Purple Launcher — {PATCH_INFO['version']}")
         self.setFixedSize(900, 620)
         self.setAcceptDrops(True)
         self.setStyleSheet("background-color: black; color: #B400FF;")
         self.selected_engine = ""
         self.selected_iwad = ""
-        self.selected_mod = ""
-        self.selected_map = ""
+        self.load_order = LoadOrder()
         self.init_ui()
         self.start_scan()
+        self.remote_api = None
+        if REMOTE_API["enabled"]:
+            self.remote_api = start_remote_api(
+                lambda: self.presets, lambda: self.preset_root, REMOTE_API["host"], REMOTE_API["port"],
+                library=ModLibrary(MOD_LIBRARY_DIR), max_upload=REMOTE_API["max_upload"],
+                server=REMOTE_API["server"]
+            )
 
     def styled_button(self, label):
         btn = QPushButton(label)
@@ -61,15 +76,19 @@ class PurpleLauncher(QWidget):
         self.iwad_label = QLabel("No IWAD selected")
         self.iwad_label.setFont(lbl_font)
 
-        self.mod_button = self.styled_button("Select Mod (.wad/.pk3)")
-        self.mod_button.clicked.connect(self.select_mod)
-        self.mod_label = QLabel("No mod selected")
-        self.mod_label.setFont(lbl_font)
-
-        self.map_button = self.styled_button("Select Map (.wad/.pk3/.zip)")
-        self.map_button.clicked.connect(self.select_map)
-        self.map_label = QLabel("No map selected")
-        self.map_label.setFont(lbl_font)
+        self.load_list = QListWidget()
+        self.load_list.setDragDropMode(QListWidget.InternalMove)
+        self.load_list.model().rowsMoved.connect(self.on_load_order_moved)
+        self.add_files_button = self.styled_button("Add Files")
+        self.add_files_button.clicked.connect(self.add_files)
+        self.remove_file_button = self.styled_button("Remove")
+        self.remove_file_button.clicked.connect(self.remove_selected_file)
+        self.move_up_button = self.styled_button("Up")
+        self.move_up_button.clicked.connect(lambda: self.move_selected_file(-1))
+        self.move_down_button = self.styled_button("Down")
+        self.move_down_button.clicked.connect(lambda: self.move_selected_file(1))
+        self.clear_files_button = self.styled_button("Clear")
+        self.clear_files_button.clicked.connect(self.clear_load_order)
 
         self.preset_list = QListWidget()
         self.preset_list.setSelectionMode(QListWidget.ExtendedSelection)
@@ -91,6 +110,10 @@ class PurpleLauncher(QWidget):
         self.refresh_presets_button.clicked.connect(self.start_scan)
         self.set_preset_dir_button = self.styled_button("Set Preset Folder")
         self.set_preset_dir_button.clicked.connect(self.set_preset_folder)
+        self.export_presets_button = self.styled_button("Export")
+        self.export_presets_button.clicked.connect(self.export_preset_bundle)
+        self.import_presets_button = self.styled_button("Import")
+        self.import_presets_button.clicked.connect(self.import_preset_bundle)
 
         self.launch_button = self.styled_button("LAUNCH")
         self.launch_button.clicked.connect(self.launch_game)
@@ -114,12 +137,16 @@ class PurpleLauncher(QWidget):
         iwad_layout.addWidget(self.iwad_label)
         iwad_group.setLayout(iwad_layout)
 
-        file_group = QGroupBox("Mod + Map")
+        file_group = QGroupBox("Load Order (mods + maps)")
         file_layout = QVBoxLayout()
-        file_layout.addWidget(self.mod_button)
-        file_layout.addWidget(self.mod_label)
-        file_layout.addWidget(self.map_button)
-        file_layout.addWidget(self.map_label)
+        file_layout.addWidget(self.load_list)
+        file_row = QHBoxLayout()
+        file_row.addWidget(self.add_files_button)
+        file_row.addWidget(self.remove_file_button)
+        file_row.addWidget(self.move_up_button)
+        file_row.addWidget(self.move_down_button)
+        file_row.addWidget(self.clear_files_button)
+        file_layout.addLayout(file_row)
         file_group.setLayout(file_layout)
 
         preset_group = QGroupBox("Presets (multi-select)")
@@ -134,13 +161,15 @@ class PurpleLauncher(QWidget):
         row2 = QHBoxLayout()
         row2.addWidget(self.refresh_presets_button)
         row2.addWidget(self.set_preset_dir_button)
+        row2.addWidget(self.export_presets_button)
+        row2.addWidget(self.import_presets_button)
         preset_layout.addLayout(row1)
         preset_layout.addLayout(row2)
         preset_group.setLayout(preset_layout)
 
         left_col.addWidget(engine_group)
         left_col.addWidget(iwad_group)
-        right_col.addWidget(file_group)
+        left_col.addWidget(file_group)
         right_col.addWidget(preset_group)
         top_row.addLayout(left_col, 1)
         top_row.addLayout(right_col, 2)
@@ -164,12 +193,16 @@ class PurpleLauncher(QWidget):
         self.scanner.scanned.connect(self.on_scan_complete)
         self.scanner.start()
 
-    def on_scan_complete(self, files):
+    def on_scan_complete(self, store):
+        self.presets = store
+        self.refresh_preset_list()
+
+    def refresh_preset_list(self):
         self.preset_list.blockSignals(True)
         self.preset_list.clear()
-        for p in files:
-            item = QListWidgetItem(os.path.relpath(p, self.preset_root))
-            item.setData(Qt.UserRole, p)
+        for pid in self.presets.sorted_ids():
+            item = QListWidgetItem(PATHS.relpath(pid, self.preset_root))
+            item.setData(Qt.UserRole, PATHS.path(pid))
             self.preset_list.addItem(item)
         self.preset_list.blockSignals(False)
         if self.preset_list.count() > 0:
@@ -190,49 +223,69 @@ class PurpleLauncher(QWidget):
 
     def dropEvent(self, event):
         dropped = [u.toLocalFile() for u in event.mimeData().urls()]
+        files = []
         for path in dropped:
             file_type = classify_file(path)
             if file_type == "engine":
                 self.selected_engine = path
-                self.engine_label.setText(os.path.basename(path))
-            elif file_type == "mod":
-                self.selected_mod = path
-                self.mod_label.setText(os.path.basename(path))
-            elif file_type in ["wad", "map"]:
-                if not self.selected_iwad:
-                    self.selected_iwad = path
-                    self.iwad_label.setText(os.path.basename(path))
-                elif not self.selected_mod:
-                    self.selected_mod = path
-                    self.mod_label.setText(os.path.basename(path))
-                elif not self.selected_map:
-                    self.selected_map = path
-                    self.map_label.setText(os.path.basename(path))
+                self.engine_label.setText(basename(path))
+            elif file_type == "wad" and not self.selected_iwad:
+                self.selected_iwad = path
+                self.iwad_label.setText(basename(path))
+            elif file_type in ["mod", "wad", "map"]:
+                files.append(path)
+        if files and self.load_order.extend(files):
+            self.refresh_load_list()
 
     def select_engine(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select Source Port", "", "Executable (*.exe)")
         if path:
             self.selected_engine = path
-            self.engine_label.setText(os.path.basename(path))
+            self.engine_label.setText(basename(path))
 
     def select_iwad(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select IWAD", "", "WAD Files (*.wad)")
         if path:
             self.selected_iwad = path
-            self.iwad_label.setText(os.path.basename(path))
+            self.iwad_label.setText(basename(path))
 
-    def select_mod(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select Mod", "", "WAD/PK3 Files (*.wad *.pk3)")
-        if path:
-            self.selected_mod = path
-            self.mod_label.setText(os.path.basename(path))
+    def add_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Add Mods / Maps", "", "Mod/Map Files (*.wad *.pk3 *.zip)")
+        if paths and self.load_order.extend(paths):
+            self.refresh_load_list()
 
-    def select_map(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select Map", "", "Map Files (*.wad *.pk3 *.zip)")
-        if path:
-            # Put zips/pk3/wad into map slot if map chosen explicitly
-            self.selected_map = path
-            self.map_label.setText(os.path.basename(path))
+    def refresh_load_list(self, current=None):
+        self.load_list.clear()
+        for p in self.load_order:
+            item = QListWidgetItem(basename(p))
+            item.setData(Qt.UserRole, p)
+            item.setToolTip(p)
+            self.load_list.addItem(item)
+        if current is not None:
+            self.load_list.setCurrentRow(current)
+
+    def on_load_order_moved(self, *args):
+        # Drag-reordering already moved the items; mirror the new order.
+        self.load_order = LoadOrder(self.load_list.item(i).data(Qt.UserRole) for i in range(self.load_list.count()))
+
+    def remove_selected_file(self):
+        row = self.load_list.currentRow()
+        if row < 0:
+            return
+        self.load_order.remove(row)
+        self.refresh_load_list(min(row, len(self.load_order) - 1))
+
+    def move_selected_file(self, step):
+        row = self.load_list.currentRow()
+        target = row + step
+        if row < 0 or not 0 <= target < len(self.load_order):
+            return
+        self.load_order.move(row, target)
+        self.refresh_load_list(target)
+
+    def clear_load_order(self):
+        self.load_order.clear()
+        self.refresh_load_list()
 
     def save_preset(self):
         start_dir = self.preset_root
@@ -242,8 +295,10 @@ class PurpleLauncher(QWidget):
         if not name.lower().endswith(".preset"):
             name += ".preset"
         try:
-            io_save_preset(name, self.selected_engine, self.selected_iwad, self.selected_mod, self.selected_map)
-            self.start_scan()
+            preset = io_save_preset(name, self.selected_engine, self.selected_iwad, self.load_order)
+            if self.in_preset_root(name):
+                self.presets.add(preset)
+                self.refresh_preset_list()
             QMessageBox.information(self, "Preset Saved", f"Preset saved: {os.path.basename(name)}")
         except Exception as e:
             QMessageBox.critical(self, "Save Failed", str(e))
@@ -253,23 +308,23 @@ class PurpleLauncher(QWidget):
         if not items:
             QMessageBox.warning(self, "Load Failed", "No presets selected.")
             return
-        combined = {"engine": "", "iwad": "", "mod": "", "map": ""}
+        combined = {"engine": "", "iwad": ""}
+        files = LoadOrder()
         for item in items:
             path = item.data(Qt.UserRole)
             if not path or not os.path.isfile(path):
                 continue
-            parsed = parse_preset(path)
+            preset = self.presets.get(path) or parse_preset(path)
             for k in combined:
                 if not combined[k]:
-                    combined[k] = parsed.get(k, "")
+                    combined[k] = getattr(preset, k)
+            files.extend(preset.files)
         self.selected_engine = combined["engine"]
         self.selected_iwad = combined["iwad"]
-        self.selected_mod = combined["mod"]
-        self.selected_map = combined["map"]
-        self.engine_label.setText(os.path.basename(self.selected_engine) if self.selected_engine else "No engine selected")
-        self.iwad_label.setText(os.path.basename(self.selected_iwad) if self.selected_iwad else "No IWAD selected")
-        self.mod_label.setText(os.path.basename(self.selected_mod) if self.selected_mod else "No mod selected")
-        self.map_label.setText(os.path.basename(self.selected_map) if self.selected_map else "No map selected")
+        self.load_order = files
+        self.engine_label.setText(basename(self.selected_engine) if self.selected_engine else "No engine selected")
+        self.iwad_label.setText(basename(self.selected_iwad) if self.selected_iwad else "No IWAD selected")
+        self.refresh_load_list()
         QMessageBox.information(self, "Presets Loaded", f"Loaded {len(items)} preset(s).")
 
     def delete_selected_presets(self):
@@ -286,15 +341,49 @@ class PurpleLauncher(QWidget):
                 continue
             try:
                 os.remove(path)
+                self.presets.remove(path)
                 deleted += 1
             except Exception:
                 failed.append(item.text())
-        self.start_scan()
+        self.refresh_preset_list()
         msg = f"Deleted {deleted} preset(s)."
         if failed:
             msg += " Failed: " + ", ".join(failed)
         QMessageBox.information(self, "Delete Presets", msg)
 
+    def export_preset_bundle(self):
+        name, _ = QFileDialog.getSaveFileName(self, "Export Presets", "", BUNDLE_FILTER)
+        if not name:
+            return
+        try:
+            count = export_presets(self.preset_root, name, self.presets)
+            QMessageBox.information(self, "Presets Exported", f"Exported {count} preset(s) to {os.path.basename(name)}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
+
+    def import_preset_bundle(self):
+        name, _ = QFileDialog.getOpenFileName(self, "Import Presets", "", BUNDLE_FILTER)
+        if not name:
+            return
+        try:
+            count, skipped = import_presets(name, self.preset_root, self.presets)
+        except Exception as e:
+            QMessageBox.critical(self, "Import Failed", str(e))
+        else:
+            message = f"Imported {count} preset(s)."
+            if skipped:
+                message += f"\n\nSkipped {len(skipped)} invalid record(s):\n" + "\n".join(skipped[:10])
+                if len(skipped) > 10:
+                    message += f"\n... and {len(skipped) - 10} more"
+            QMessageBox.information(self, "Presets Imported", message)
+        self.refresh_preset_list()
+
+    def in_preset_root(self, path):
+        try:
+            return os.path.commonpath([self.preset_root, os.path.abspath(path)]) == self.preset_root
+        except ValueError:
+            return False
+
     def set_preset_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Preset Folder", self.preset_root)
         if folder:
@@ -306,15 +395,8 @@ class PurpleLauncher(QWidget):
         if not self.selected_engine:
             QMessageBox.warning(self, "Launch Failed", "No source port selected.")
             return
-        cmd = [self.selected_engine]
-        if self.selected_iwad:
-            cmd += ["-iwad", self.selected_iwad]
-        if self.selected_mod:
-            cmd += ["-file", self.selected_mod]
-        if self.selected_map:
-            cmd += ["-file", self.selected_map]
         try:
-            subprocess.Popen(cmd)
+            PROCESSES.launch(self.selected_engine, self.selected_iwad, self.load_order)
         except Exception as e:
             QMessageBox.critical(self, "Launch Failed", str(e))
 
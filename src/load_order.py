@@ -0,0 +1,65 @@
+import os
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class LoadOrder:
+    def __init__(self, paths=()):
+        self._paths = []
+        self._keys = set()
+        self.extend(paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __getitem__(self, index):
+        return self._paths[index]
+
+    def __contains__(self, path):
+        return bool(path) and _key(path) in self._keys
+
+    def add(self, path):
+        if not path:
+            return False
+        key = _key(path)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._paths.append(path)
+        return True
+
+    def extend(self, paths):
+        added = 0
+        for path in paths:
+            if self.add(path):
+                added += 1
+        return added
+
+    def remove(self, index):
+        path = self._paths.pop(index)
+        self._keys.discard(_key(path))
+        return path
+
+    def move(self, src, dst):
+        if src == dst:
+            return
+        path = self._paths.pop(src)
+        self._paths.insert(dst, path)
+
+    def clear(self):
+        self._paths.clear()
+        self._keys.clear()
+
+    def paths(self):
+        return list(self._paths)
+
+    def args(self):
+        # Source ports accept any number of files after a single -file switch.
+        if not self._paths:
+            return []
+        return ["-file"] + self._paths
\ No newline at end of file
@@ -0,0 +1,232 @@
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import threading
+import zipfile
+from file_utils import classify_file
+from preset_io import fsync_dir
+
+LIBRARY_KINDS = ("mod", "wad", "map")
+CHUNK_SIZE = 1 << 20
+# ZIP central directories are read from the last bytes of the stream; larger
+# ones (or ZIP64 archives) fall back to reading the finished file.
+ZIP_TAIL = 1 << 20
+MAX_WAD_LUMPS = 1 << 20
+
+_WAD_HEADER = struct.Struct("<4sii")
+_WAD_LUMP = struct.Struct("<ii8s")
+_ZIP_EOCD = struct.Struct("<4s4H2LH")
+_ZIP_ENTRY = struct.Struct("<4s6H3L5H2L")
+_MAP_LUMP = re.compile(r"^(MAP\d\d|E\dM\d)$")
+
+class ModIndexer:
+    # Fed the file front to back: hashes it and picks the WAD directory or the
+    # ZIP central directory out of the stream, so nothing is read twice.
+    def __init__(self, kind):
+        self.zip = kind != "wad"
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self._head = b""
+        self._tail = bytearray()
+        self._lumps = None
+        self._directory = bytearray()
+
+    def feed(self, data):
+        self.hash.update(data)
+        start = self.size
+        self.size += len(data)
+        if len(self._head) < _WAD_HEADER.size:
+            self._head += bytes(data[:_WAD_HEADER.size - len(self._head)])
+        if self.zip:
+            self._tail += data
+            if len(self._tail) > 2 * ZIP_TAIL:
+                del self._tail[:-ZIP_TAIL]
+            return
+        if self._lumps is None and len(self._head) == _WAD_HEADER.size:
+            magic, count, offset = _WAD_HEADER.unpack(self._head)
+            if magic not in (b"IWAD", b"PWAD") or not 0 <= count <= MAX_WAD_LUMPS or offset < _WAD_HEADER.size:
+                raise ValueError("Not a valid WAD file.")
+            self._lumps = (count, offset, offset + count * _WAD_LUMP.size)
+        if self._lumps:
+            _, lo, hi = self._lumps
+            lo, hi = max(lo, start), min(hi, self.size)
+            if lo < hi:
+                self._directory += data[lo - start:hi - start]
+
+    def finish(self, fp):
+        index = self._zip_index(fp) if self.zip else self._wad_index()
+        index["size"] = self.size
+        index["sha256"] = self.hash.hexdigest()
+        return index
+
+    def _wad_index(self):
+        if self._lumps is None:
+            raise ValueError("Not a valid WAD file.")
+        count = self._lumps[0]
+        if len(self._directory) != count * _WAD_LUMP.size:
+            raise ValueError("WAD directory is truncated.")
+        maps = []
+        for _, _, name in _WAD_LUMP.iter_unpack(bytes(self._directory)):
+            name = name.split(b"\0", 1)[0].decode("ascii", "replace").upper()
+            if _MAP_LUMP.match(name):
+                maps.append(name)
+        return {"format": self._head[:4].decode("ascii"), "lumps": count, "maps": maps}
+
+    def _zip_index(self, fp):
+        names = self._zip_names()
+        if names is None:
+            # ZIP64 or a central directory bigger than the tail; zipfile only
+            # reads the directory itself, not the member data.
+            fp.seek(0)
+            try:
+                names = zipfile.ZipFile(fp).namelist()
+            except zipfile.BadZipFile:
+                raise ValueError("Not a valid ZIP/PK3 file.")
+        maps = sorted({
+            os.path.splitext(name[5:])[0].upper()
+            for name in names
+            if name.lower().startswith("maps/") and name.lower().endswith(".wad")
+        })
+        return {"format": "ZIP", "entries": len(names), "maps": maps}
+
+    def _zip_names(self):
+        tail = bytes(self._tail)
+        at = tail.rfind(b"PK\x05\x06")
+        if at < 0 or len(tail) - at < _ZIP_EOCD.size:
+            return None
+        _, _, _, _, total, cd_size, cd_offset, _ = _ZIP_EOCD.unpack_from(tail, at)
+        # Offsets are relative to the end so prepended data (SFX stubs) works.
+        cd_start = at - cd_size
+        if total == 0xFFFF or cd_offset == 0xFFFFFFFF or cd_start < 0:
+            return None
+        names = []
+        pos = cd_start
+        for _ in range(total):
+            if pos + _ZIP_ENTRY.size > at:
+                return None
+            entry = _ZIP_ENTRY.unpack_from(tail, pos)
+            if entry[0] != b"PK\x01\x02":
+                return None
+            flags, name_len, extra_len, comment_len = entry[3], entry[10], entry[11], entry[12]
+            name = tail[pos + _ZIP_ENTRY.size:pos + _ZIP_ENTRY.size + name_len]
+            names.append(name.decode("utf-8" if flags & 0x800 else "cp437"))
+            pos += _ZIP_ENTRY.size + name_len + extra_len + comment_len
+        return names
+
+def index_file(path, kind):
+    indexer = ModIndexer(kind)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            indexer.feed(chunk)
+        return indexer.finish(f)
+
+class ModLibrary:
+    # A flat folder of .wad/.pk3/.zip files. Uploads are written to a temp file
+    # in the same folder and renamed into place, so they are written only once
+    # and a file in the folder is always complete.
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def kind(self, name):
+        if not name or name != os.path.basename(name) or name.startswith(".") or "\\" in name:
+            raise ValueError(f"Invalid mod file name: {name}")
+        kind = classify_file(name)
+        if kind not in LIBRARY_KINDS:
+            raise ValueError(f"Unsupported mod file type: {name}")
+        return kind
+
+    def path(self, name):
+        self.kind(name)
+        return os.path.join(self.root, name)
+
+    def entries(self):
+        # Cheap listing from the directory itself; full indexes come from get().
+        items = []
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith(".") and classify_file(entry.name) in LIBRARY_KINDS:
+                        items.append({"name": entry.name, "kind": classify_file(entry.name), "size": entry.stat().st_size})
+        except FileNotFoundError:
+            pass
+        items.sort(key=lambda item: item["name"].lower())
+        return items
+
+    def get(self, name):
+        kind = self.kind(name)
+        path = os.path.join(self.root, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._index.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        # Files copied in by hand are indexed on first use.
+        entry = self._entry(name, kind, path, index_file(path, kind))
+        with self._lock:
+            self._index[name] = (stamp, entry)
+        return entry
+
+    def _entry(self, name, kind, path, index):
+        entry = {"name": name, "kind": kind, "path": path}
+        entry.update(index)
+        return entry
+
+    def store(self, name, chunks, overwrite=False, max_size=None, fsync=False, expected_size=None):
+        kind = self.kind(name)
+        path = os.path.join(self.root, name)
+        if not overwrite and os.path.exists(path):
+            raise FileExistsError(f"{name} is already in the library.")
+        os.makedirs(self.root, exist_ok=True)
+        indexer = ModIndexer(kind)
+        fd, tmp = tempfile.mkstemp(prefix="." + name + ".", suffix=".part", dir=self.root)
+        try:
+            with os.fdopen(fd, "w+b") as f:
+                for chunk in chunks:
+                    indexer.feed(chunk)
+                    if max_size is not None and indexer.size > max_size:
+                        raise OverflowError(f"Upload exceeds {max_size} bytes.")
+                    f.write(chunk)
+                # A dropped connection just ends the chunks early; the WAD and
+                # ZIP checks would not always notice the missing tail.
+                if expected_size is not None and indexer.size != expected_size:
+                    raise ValueError(f"Upload ended after {indexer.size} of {expected_size} bytes.")
+                f.flush()
+                index = indexer.finish(f)
+                if fsync:
+                    os.fsync(f.fileno())
+            if overwrite:
+                os.replace(tmp, path)
+            else:
+                # link() fails if another upload claimed the name meanwhile.
+                try:
+                    os.link(tmp, path)
+                except FileExistsError:
+                    raise
+                except OSError:
+                    # No hard links on this filesystem (FAT); a rename is close enough.
+                    if os.path.exists(path):
+                        raise FileExistsError(f"{name} is already in the library.")
+                    os.replace(tmp, path)
+                else:
+                    os.remove(tmp)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        if fsync:
+            fsync_dir(self.root)
+        st = os.stat(path)
+        entry = self._entry(name, kind, path, index)
+        with self._lock:
+            self._index[name] = ((st.st_size, st.st_mtime_ns), entry)
+        return entry
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+import threading
+
+class PathTable:
+    # ID 0 is always the empty path so unset slots need no special casing.
+    def __init__(self):
+        self._ids = {"": 0}
+        self._paths = [""]
+        self._basenames = [""]
+        self._relpaths = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._paths)
+
+    def intern(self, path):
+        pid = self._ids.get(path)
+        if pid is not None:
+            return pid
+        with self._lock:
+            pid = self._ids.get(path)
+            if pid is None:
+                pid = len(self._paths)
+                self._paths.append(path)
+                self._basenames.append(os.path.basename(path))
+                self._ids[path] = pid
+        return pid
+
+    def lookup(self, path):
+        return self._ids.get(path)
+
+    def canonical(self, path):
+        return self._paths[self.intern(path)]
+
+    def path(self, pid):
+        return self._paths[pid]
+
+    def basename(self, pid):
+        return self._basenames[pid]
+
+    def relpath(self, pid, root):
+        cache = self._relpaths.get(root)
+        if cache is None:
+            # setdefault so two threads can't each install their own cache.
+            cache = self._relpaths.setdefault(root, {})
+        rel = cache.get(pid)
+        if rel is None:
+            path = self._paths[pid]
+            try:
+                rel = os.path.relpath(path, root) if path else ""
+            except ValueError:
+                # Different drive on Windows; fall back to the full path.
+                rel = path
+            cache[pid] = rel
+        return rel
+
+PATHS = PathTable()
+
+def basename(path):
+    return PATHS.basename(PATHS.intern(path))
+
+def relpath(path, root):
+    return PATHS.relpath(PATHS.intern(path), root)
\ No newline at end of file
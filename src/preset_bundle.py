@@ -0,0 +1,120 @@
+import gzip
+import json
+import os
+import tarfile
+from file_utils import iter_files
+from preset_io import PRESET_SUFFIX, PresetBatch, parse_preset, parse_preset_lines
+
+# Supported bundle formats, picked from the file name:
+#   .jsonl / .jsonl.gz   one JSON record per preset
+#   .tar.gz / .tgz       the raw .preset files
+JSONL_SUFFIXES = (".jsonl", ".jsonl.gz")
+TAR_SUFFIXES = (".tar.gz", ".tgz")
+
+def bundle_format(path):
+    lower = path.lower()
+    if lower.endswith(JSONL_SUFFIXES):
+        return "jsonl"
+    if lower.endswith(TAR_SUFFIXES):
+        return "tar"
+    raise ValueError(f"Unsupported bundle type: {os.path.basename(path)}")
+
+def _rel(path, root):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+def _target(root, rel):
+    # Refuse absolute names and ../ so a bundle can't write outside the root.
+    parts = [p for p in rel.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts or os.path.isabs(rel) or ":" in parts[0]:
+        raise ValueError(f"Unsafe preset path in bundle: {rel}")
+    if not parts[-1].lower().endswith(PRESET_SUFFIX):
+        parts[-1] += PRESET_SUFFIX
+    return os.path.join(root, *parts)
+
+def _open_text(path, mode):
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def _preset_paths(root, store):
+    if store is not None:
+        return store.sorted_paths()
+    return sorted(iter_files(root, PRESET_SUFFIX))
+
+def export_presets(root, dest, store=None):
+    root = os.path.abspath(root)
+    paths = _preset_paths(root, store)
+    if bundle_format(dest) == "tar":
+        with tarfile.open(dest, "w:gz") as tar:
+            for path in paths:
+                tar.add(path, arcname=_rel(path, root), recursive=False)
+        return len(paths)
+    with _open_text(dest, "w") as out:
+        for path in paths:
+            preset = store.get(path) if store is not None else None
+            record = (preset or parse_preset(path)).as_dict()
+            record["path"] = _rel(path, root)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(paths)
+
+def _jsonl_fields(record, root):
+    # Checked up front so a bad record can't stop an import halfway through.
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    rel = record.get("path")
+    if not isinstance(rel, str) or not rel:
+        raise ValueError("\"path\" must be a non-empty string")
+    engine = record.get("engine") or ""
+    iwad = record.get("iwad") or ""
+    if not isinstance(engine, str) or not isinstance(iwad, str):
+        raise ValueError("\"engine\" and \"iwad\" must be strings")
+    files = record.get("files", [])
+    if not isinstance(files, list) or not all(isinstance(p, str) for p in files):
+        raise ValueError("\"files\" must be a list of strings")
+    return _target(root, rel), engine, iwad, files
+
+def _iter_jsonl(src, root, skipped):
+    with _open_text(src, "r") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield _jsonl_fields(json.loads(line), root)
+            except ValueError as e:
+                skipped.append(f"line {number}: {e}")
+
+def _iter_tar(src, root, skipped):
+    # Stream mode reads members in order without seeking or loading the index.
+    with tarfile.open(src, "r|*") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith(PRESET_SUFFIX):
+                continue
+            try:
+                path = _target(root, member.name)
+            except ValueError as e:
+                skipped.append(f"{member.name}: {e}")
+                continue
+            text = tar.extractfile(member).read().decode("utf-8", "replace")
+            preset = parse_preset_lines(member.name, text.splitlines())
+            yield path, preset.engine, preset.iwad, preset.files
+
+def import_presets(src, root, store=None, fsync=False):
+    # Returns the number of presets written and a description of each
+    # record that was skipped because it was malformed or pointed outside root.
+    root = os.path.abspath(root)
+    skipped = []
+    if bundle_format(src) == "jsonl":
+        records = _iter_jsonl(src, root, skipped)
+    else:
+        records = _iter_tar(src, root, skipped)
+    made = set()
+    count = 0
+    with PresetBatch(store, fsync=fsync) as batch:
+        for path, engine, iwad, files in records:
+            folder = os.path.dirname(path)
+            if folder not in made:
+                os.makedirs(folder, exist_ok=True)
+                made.add(folder)
+            batch.save(path, engine, iwad, files)
+            count += 1
+    return count, skipped
\ No newline at end of file
@@ -1,36 +1,86 @@
 import os
+import stat
+import tempfile
 from datetime import datetime
 from config import PATCH_INFO
+from load_order import LoadOrder
+from path_table import PATHS, relpath
+
+PRESET_SUFFIX = ".preset"
+
+# Presets written before load order support stored at most one mod and one map.
+LEGACY_FILE_KEYS = ("mod", "map")
+
+# mkstemp creates files as 0600; new presets get the usual umask-based mode.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Big collections repeat the same few mod stacks, so equal file tuples are shared.
+_FILE_TUPLES = {}
+
+def intern_files(files):
+    files = tuple(PATHS.canonical(p) for p in files)
+    return _FILE_TUPLES.setdefault(files, files)
+
+class Preset:
+    __slots__ = ("path", "name", "engine", "iwad", "files")
+
+    def __init__(self, path="", name="", engine="", iwad="", files=()):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.engine = PATHS.canonical(engine)
+        self.iwad = PATHS.canonical(iwad)
+        self.files = intern_files(files)
+
+    def __repr__(self):
+        return f"Preset({self.path!r}, engine={self.engine!r}, iwad={self.iwad!r}, files={len(self.files)})"
+
+    def as_dict(self):
+        return {"path": self.path, "name": self.name, "engine": self.engine, "iwad": self.iwad, "files": list(self.files)}
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        yield from f
 
 def parse_preset(path):
-    result = {"engine": "", "iwad": "", "mod": "", "map": ""}
+    return parse_preset_lines(path, _read_lines(path))
+
+def parse_preset_lines(path, lines):
+    result = {"name": "", "engine": "", "iwad": ""}
+    legacy = {key: "" for key in LEGACY_FILE_KEYS}
+    files = []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if "=" in line and not line.strip().startswith("#"):
-                    key, value = line.strip().split("=", 1)
-                    if key in result and not result[key]:
-                        result[key] = value
+        for line in lines:
+            if "=" in line and not line.strip().startswith("#"):
+                key, value = line.strip().split("=", 1)
+                if key == "file":
+                    files.append(value)
+                elif key in legacy and not legacy[key]:
+                    legacy[key] = value
+                elif key in result and not result[key]:
+                    result[key] = value
     except Exception:
         pass
-    return result
+    order = LoadOrder(legacy[key] for key in LEGACY_FILE_KEYS)
+    order.extend(files)
+    return Preset(path, files=order, **result)
 
 def preview_presets(paths, root):
     previews = []
     for path in paths:
         if not path or not os.path.isfile(path):
-            previews.append(f"Missing: {os.path.relpath(path, root)}")
+            previews.append(f"Missing: {relpath(path, root)}")
             continue
         try:
             with open(path, "r", encoding="utf-8") as f:
                 content = f.read()
-            header = f"--- {os.path.relpath(path, root)} ---"
+            header = f"--- {relpath(path, root)} ---"
             previews.append(header + "\n" + content)
         except Exception as e:
             previews.append(f"Failed to read {os.path.basename(path)}: {e}")
     return "\n\n".join(previews)
 
-def save_preset(path, engine, iwad, mod, mapf):
+def format_preset(path, engine, iwad, files=()):
     header = [
         "# Purple Launcher preset",
         f"# Created: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%SZ')}",
@@ -38,9 +88,79 @@ def save_preset(path, engine, iwad, mod, mapf):
         "[PRESET]",
         f"name={os.path.splitext(os.path.basename(path))[0]}",
         f"engine={engine or ''}",
-        f"iwad={iwad or ''}",
-        f"mod={mod or ''}",
-        f"map={mapf or ''}"
+        f"iwad={iwad or ''}"
     ]
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(header) + "\n")
\ No newline at end of file
+    header += [f"file={p}" for p in LoadOrder(files)]
+    return "\n".join(header) + "\n"
+
+def fsync_dir(folder):
+    # Directories can't be opened for fsync on Windows; the rename is enough there.
+    if os.name != "posix":
+        return
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write(path, text, fsync=False, sync_dir=True):
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if fsync and sync_dir:
+        fsync_dir(folder)
+
+def save_preset(path, engine, iwad, files=(), fsync=False):
+    atomic_write(path, format_preset(path, engine, iwad, files), fsync=fsync)
+    return Preset(path, engine=engine or "", iwad=iwad or "", files=LoadOrder(files))
+
+class PresetBatch:
+    # Writes many presets and hands them to the index in one update on exit.
+    def __init__(self, store=None, fsync=False):
+        self.store = store
+        self.fsync = fsync
+        self.saved = []
+        self._dirs = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.commit()
+        return False
+
+    def save(self, path, engine, iwad, files=()):
+        text = format_preset(path, engine, iwad, files)
+        atomic_write(path, text, fsync=self.fsync, sync_dir=False)
+        self._dirs.add(os.path.dirname(os.path.abspath(path)))
+        preset = Preset(path, engine=engine or "", iwad=iwad or "", files=LoadOrder(files))
+        self.saved.append(preset)
+        return preset
+
+    def commit(self):
+        # Files already on disk are indexed even if the batch was interrupted.
+        if self.fsync:
+            for folder in self._dirs:
+                fsync_dir(folder)
+        self._dirs.clear()
+        saved, self.saved = self.saved, []
+        if self.store is not None and saved:
+            self.store.update(saved)
+        return saved
\ No newline at end of file
@@ -1,8 +1,10 @@
-import os
 from PyQt5.QtCore import QThread, pyqtSignal
+from file_utils import iter_files
+from preset_io import PRESET_SUFFIX, parse_preset
+from preset_store import PresetStore
 
 class PresetScanner(QThread):
-    scanned = pyqtSignal(list)
+    scanned = pyqtSignal(object)
 
     def __init__(self, root):
         super().__init__()
@@ -12,25 +14,17 @@ class PresetScanner(QThread):
     def run(self):
         results = []
         try:
-            stack = [self.root]
-            while stack and self._running:
-                current = stack.pop()
-                try:
-                    with os.scandir(current) as it:
-                        for entry in it:
-                            if not self._running:
-                                break
-                            if entry.is_dir(follow_symlinks=False):
-                                stack.append(entry.path)
-                            elif entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".preset"):
-                                results.append(entry.path)
-                except PermissionError:
-                    continue
+            results.extend(iter_files(self.root, PRESET_SUFFIX, lambda: self._running))
         except Exception:
             pass
         results.sort()
+        store = PresetStore()
+        for path in results:
+            if not self._running:
+                return
+            store.add(parse_preset(path))
         if self._running:
-            self.scanned.emit(results)
+            self.scanned.emit(store)
 
     def stop(self):
         self._running = False
\ No newline at end of file
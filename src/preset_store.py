@@ -0,0 +1,156 @@
+import threading
+from array import array
+from collections import Counter
+from path_table import PATHS
+from preset_io import Preset, PresetBatch, parse_preset
+
+class PresetStore:
+    # Columnar: one array per field, row i across all of them is one preset.
+    # Paths are stored as PATHS ids; files holds the shared interned tuples.
+    COLUMNS = ("paths", "names", "engines", "iwads", "files")
+    # The GUI thread changes the store while the remote API threads read it.
+    # Mutators take the lock themselves; readers on other threads hold it
+    # across every lookup that must see the same rows (remove() moves rows).
+
+    def __init__(self):
+        self.paths = array("I")
+        self.names = []
+        self.engines = array("I")
+        self.iwads = array("I")
+        self.files = []
+        self._rows = {}
+        self.lock = threading.RLock()
+        # Bumped on every change so derived views can be cached per version.
+        self.version = 0
+        self._sorted = (-1, None)
+        self._catalog = (-1, None)
+
+    @classmethod
+    def from_paths(cls, paths, parse=parse_preset):
+        store = cls()
+        for path in paths:
+            store.add(parse(path))
+        return store
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return PATHS.lookup(path) in self._rows
+
+    def __iter__(self):
+        for row in range(len(self.paths)):
+            yield self.row(row)
+
+    def add(self, preset):
+        pid = PATHS.intern(preset.path)
+        engine = PATHS.intern(preset.engine)
+        iwad = PATHS.intern(preset.iwad)
+        with self.lock:
+            row = self._rows.get(pid)
+            self.version += 1
+            if row is None:
+                self._rows[pid] = len(self.paths)
+                self.paths.append(pid)
+                self.names.append(preset.name)
+                self.engines.append(engine)
+                self.iwads.append(iwad)
+                self.files.append(preset.files)
+            else:
+                self.names[row] = preset.name
+                self.engines[row] = engine
+                self.iwads[row] = iwad
+                self.files[row] = preset.files
+
+    def update(self, presets):
+        with self.lock:
+            for preset in presets:
+                self.add(preset)
+
+    def batch(self, fsync=False):
+        return PresetBatch(self, fsync=fsync)
+
+    def remove(self, path):
+        with self.lock:
+            row = self._rows.pop(PATHS.lookup(path), None)
+            if row is None:
+                return False
+            self.version += 1
+            # Move the last row into the hole so removal stays O(1).
+            last = len(self.paths) - 1
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+                column.pop()
+            if row != last:
+                self._rows[self.paths[row]] = row
+            return True
+
+    def row(self, row):
+        preset = Preset.__new__(Preset)
+        preset.path = PATHS.path(self.paths[row])
+        preset.name = self.names[row]
+        preset.engine = PATHS.path(self.engines[row])
+        preset.iwad = PATHS.path(self.iwads[row])
+        preset.files = self.files[row]
+        return preset
+
+    def get(self, path):
+        row = self._rows.get(PATHS.lookup(path))
+        return None if row is None else self.row(row)
+
+    def sorted_ids(self):
+        with self.lock:
+            version, ids = self._sorted
+            if version != self.version:
+                ids = sorted(self.paths, key=PATHS.path)
+                self._sorted = (self.version, ids)
+            return ids
+
+    def sorted_paths(self):
+        return [PATHS.path(pid) for pid in self.sorted_ids()]
+
+    def rows_where(self, column, value):
+        pid = PATHS.lookup(value)
+        if pid is None:
+            return []
+        return [row for row, v in enumerate(getattr(self, column)) if v == pid]
+
+    def filter_by_engine(self, engine):
+        return self.rows_where("engines", engine)
+
+    def filter_by_iwad(self, iwad):
+        return self.rows_where("iwads", iwad)
+
+    def filter_by_file(self, path):
+        pid = PATHS.lookup(path)
+        if pid is None:
+            return []
+        path = PATHS.path(pid)
+        return [row for row, files in enumerate(self.files) if path in files]
+
+    def row_of(self, path):
+        return self._rows.get(PATHS.lookup(path))
+
+    def row_of_id(self, pid):
+        return self._rows.get(pid)
+
+    def asset_catalog(self):
+        with self.lock:
+            version, catalog = self._catalog
+            if version == self.version:
+                return catalog
+            engines = Counter(self.engines)
+            iwads = Counter(self.iwads)
+            files = Counter()
+            for stack in self.files:
+                files.update(stack)
+            engines.pop(0, None)
+            iwads.pop(0, None)
+            catalog = {
+                "engines": {PATHS.path(pid): n for pid, n in engines.items()},
+                "iwads": {PATHS.path(pid): n for pid, n in iwads.items()},
+                "files": dict(files)
+            }
+            self._catalog = (self.version, catalog)
+            return catalog
\ No newline at end of file
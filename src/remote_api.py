@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import bottle
+from config import REMOTE_API
+from game_process import PROCESSES
+from mod_library import CHUNK_SIZE
+from path_table import PATHS
+
+DEFAULT_PAGE = 100
+MAX_PAGE = 1000
+
+def _page(total):
+    query = bottle.request.query
+    try:
+        offset = max(0, int(query.get("offset") or 0))
+        limit = min(MAX_PAGE, max(1, int(query.get("limit") or DEFAULT_PAGE)))
+    except ValueError:
+        bottle.abort(400, "offset and limit must be integers.")
+    return offset, limit, {"total": total, "offset": offset, "limit": limit}
+
+def _json_error(res):
+    bottle.response.content_type = "application/json"
+    # Same compact form the JSON plugin uses for the handlers' own responses.
+    return json.dumps({"status": res.status_code, "error": res.body}, separators=(",", ":"))
+
+class RemoteAPI:
+    # The store is read through get_store() on every request so a rescan in the
+    # GUI is picked up without restarting the server; nothing here touches disk.
+    # Handlers hold store.lock while they look up rows, because the GUI thread
+    # may add or remove presets (and so move rows) at the same time.
+    def __init__(self, get_store, get_root, processes=PROCESSES, library=None, max_upload=None):
+        self.get_store = get_store
+        self.get_root = get_root
+        self.processes = processes
+        self.library = library
+        self.max_upload = max_upload
+        self.app = bottle.Bottle()
+        self.app.default_error_handler = _json_error
+        route = self.app.route
+        route("/api/presets", callback=self.list_presets)
+        route("/api/presets/<rel:path>", callback=self.get_preset)
+        route("/api/assets", callback=self.list_assets)
+        route("/api/launch", method="POST", callback=self.launch)
+        route("/api/processes", callback=self.list_processes)
+        route("/api/processes/<launch_id:int>", callback=self.get_process)
+        if library is not None:
+            route("/api/mods", callback=self.list_mods)
+            route("/api/mods/<name>", callback=self.get_mod)
+            route("/api/mods/<name>", method="PUT", callback=self.upload_mod)
+
+    def record(self, store, row, root):
+        return {
+            "path": PATHS.relpath(store.paths[row], root).replace(os.sep, "/"),
+            "name": store.names[row],
+            "engine": PATHS.path(store.engines[row]),
+            "iwad": PATHS.path(store.iwads[row]),
+            "files": list(store.files[row])
+        }
+
+    def find_row(self, store, rel):
+        parts = [p for p in rel.split("/") if p]
+        if not parts or ".." in parts:
+            bottle.abort(404, "No such preset.")
+        row = store.row_of(os.path.join(self.get_root(), *parts))
+        if row is None:
+            bottle.abort(404, "No such preset.")
+        return row
+
+    def list_presets(self):
+        store = self.get_store()
+        root = self.get_root()
+        engine = bottle.request.query.get("engine")
+        iwad = bottle.request.query.get("iwad")
+        with store.lock:
+            if engine or iwad:
+                rows = set(store.filter_by_engine(engine)) if engine else None
+                if iwad:
+                    matched = store.filter_by_iwad(iwad)
+                    rows = set(matched) if rows is None else rows.intersection(matched)
+                ids = sorted((store.paths[row] for row in rows), key=PATHS.path)
+            else:
+                ids = store.sorted_ids()
+            offset, limit, page = _page(len(ids))
+            page["items"] = [self.record(store, store.row_of_id(pid), root) for pid in ids[offset:offset + limit]]
+        return page
+
+    def get_preset(self, rel):
+        store = self.get_store()
+        with store.lock:
+            return self.record(store, self.find_row(store, rel), self.get_root())
+
+    def list_assets(self):
+        catalog = self.get_store().asset_catalog()
+        kind = bottle.request.query.get("kind")
+        if kind:
+            if kind not in catalog:
+                bottle.abort(400, "kind must be one of: " + ", ".join(catalog))
+            items = sorted(catalog[kind].items())
+            offset, limit, page = _page(len(items))
+            page["items"] = [{"path": p, "presets": n} for p, n in items[offset:offset + limit]]
+            return page
+        return {kind: len(paths) for kind, paths in catalog.items()}
+
+    def launch(self):
+        # Only indexed presets can be launched, never a command line from the request.
+        body = bottle.request.json or {}
+        rel = body.get("preset") if isinstance(body, dict) else None
+        if not rel:
+            bottle.abort(400, "Request body must be JSON with a \"preset\" path.")
+        store = self.get_store()
+        with store.lock:
+            preset = store.row(self.find_row(store, rel))
+        if not preset.engine:
+            bottle.abort(409, "Preset has no source port.")
+        # Library mods are appended to the preset's load order by name.
+        mods = body.get("mods") or []
+        if not isinstance(mods, list):
+            bottle.abort(400, "\"mods\" must be a list of library file names.")
+        files = list(preset.files) + [self.mod_path(name) for name in mods]
+        try:
+            launch_id = self.processes.launch(preset.engine, preset.iwad, files)
+        except OSError as e:
+            bottle.abort(500, str(e))
+        bottle.response.status = 201
+        return self.processes.status(launch_id)
+
+    def list_processes(self):
+        items = self.processes.all_status()
+        offset, limit, page = _page(len(items))
+        page["items"] = items[offset:offset + limit]
+        return page
+
+    def get_process(self, launch_id):
+        status = self.processes.status(launch_id)
+        if status is None:
+            bottle.abort(404, "No such launch.")
+        return status
+
+    def mod_path(self, name):
+        if self.library is None or not isinstance(name, str):
+            bottle.abort(404, "No such mod.")
+        try:
+            path = self.library.path(name)
+        except ValueError:
+            bottle.abort(404, "No such mod.")
+        if not os.path.isfile(path):
+            bottle.abort(404, "No such mod.")
+        return path
+
+    def mod_record(self, entry):
+        return {key: value for key, value in entry.items() if key != "path"}
+
+    def list_mods(self):
+        items = self.library.entries()
+        offset, limit, page = _page(len(items))
+        page["items"] = items[offset:offset + limit]
+        return page
+
+    def get_mod(self, name):
+        try:
+            entry = self.library.get(name)
+        except ValueError:
+            entry = None
+        if entry is None:
+            bottle.abort(404, "No such mod.")
+        return self.mod_record(entry)
+
+    def upload_mod(self, name):
+        # The body goes straight from the socket into the library folder,
+        # hashed and indexed on the way; bottle never spools it.
+        request = bottle.request
+        if not request.chunked and request.content_length < 0:
+            bottle.abort(411, "Content-Length or chunked transfer encoding is required.")
+        if self.max_upload is not None and request.content_length > self.max_upload:
+            bottle.abort(413, f"Uploads are limited to {self.max_upload} bytes.")
+        overwrite = request.query.get("overwrite") in ("1", "true")
+        expected = None if request.chunked else request.content_length
+        try:
+            entry = self.library.store(name, request.iter_body(CHUNK_SIZE), overwrite, self.max_upload,
+                                       expected_size=expected)
+        except FileExistsError as e:
+            bottle.abort(409, str(e))
+        except OverflowError as e:
+            bottle.abort(413, str(e))
+        except ValueError as e:
+            bottle.abort(400, str(e))
+        bottle.response.status = 201
+        return self.mod_record(entry)
+
+def start_remote_api(get_store, get_root, host="127.0.0.1", port=8090, library=None, max_upload=None,
+                     server=REMOTE_API["server"]):
+    api = RemoteAPI(get_store, get_root, library=library, max_upload=max_upload)
+    thread = threading.Thread(
+        target=bottle.run,
+        kwargs={"app": api.app, "host": host, "port": port, "server": server, "quiet": True},
+        daemon=True
+    )
+    thread.start()
+    return api
\ No newline at end of file
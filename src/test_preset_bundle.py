@@ -0,0 +1,58 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from preset_bundle import import_presets
+
+GOOD = "[PRESET]\nengine=gzdoom.exe\niwad=doom2.wad\nfile=maps.wad\n"
+
+class ImportUnsafePathsTest(unittest.TestCase):
+    # Unsafe records are skipped; the records around them are still imported.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "presets")
+        os.makedirs(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def imported(self):
+        found = []
+        for folder, _, names in os.walk(self.tmp.name):
+            found += [os.path.relpath(os.path.join(folder, n), self.tmp.name).replace(os.sep, "/") for n in names]
+        return sorted(found)
+
+    def test_jsonl(self):
+        src = os.path.join(self.tmp.name, "bundle.jsonl")
+        records = [
+            {"path": "a.cfg", "engine": "gzdoom.exe", "files": ["maps.wad"]},
+            {"path": "../evil"},
+            {"path": "/abs/evil"},
+            {"path": "C:/evil"},
+            {"path": "sub/b.cfg", "files": []}
+        ]
+        with open(src, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(r) for r in records) + "\n")
+        count, skipped = import_presets(src, self.root)
+        self.assertEqual(count, 2)
+        self.assertEqual([s.split(":")[0] for s in skipped], ["line 2", "line 3", "line 4"])
+        self.assertEqual(self.imported(), ["bundle.jsonl", "presets/a.cfg.preset", "presets/sub/b.cfg.preset"])
+
+    def test_tar(self):
+        src = os.path.join(self.tmp.name, "bundle.tar.gz")
+        with tarfile.open(src, "w:gz") as tar:
+            for name in ("a.preset", "../evil.preset", "b.preset"):
+                data = GOOD.encode("utf-8")
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        count, skipped = import_presets(src, self.root)
+        self.assertEqual(count, 2)
+        self.assertEqual(len(skipped), 1)
+        self.assertTrue(skipped[0].startswith("../evil.preset: "))
+        self.assertEqual(self.imported(), ["bundle.tar.gz", "presets/a.preset", "presets/b.preset"])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file